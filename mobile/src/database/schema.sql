@@ -259,6 +259,12 @@ CREATE INDEX IF NOT EXISTS idx_entity_attrs_entity ON entity_attributes(entity_i
 CREATE INDEX IF NOT EXISTS idx_recommendations_profile ON recommendations(profile_id);
 CREATE INDEX IF NOT EXISTS idx_recommendations_status ON recommendations(status);
 
+-- BOLT OPTIMIZATION: O(1) lookup of materialized RL recommendations by context
+-- Expected: Apps read the twin's suggestion for "now" with one index probe instead of running the policy.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recommendations_rl_context
+ON recommendations(profile_id, recommendation_type, json_extract(metadata, '$.context_key'))
+WHERE recommendation_type = 'rl_action';
+
 -- TUBER OPTIMIZATION: Multi-tenant isolation and performance indexes
 CREATE INDEX IF NOT EXISTS idx_entity_attrs_profile_type ON entity_attributes(profile_id, attribute_type);
 CREATE INDEX IF NOT EXISTS idx_workflows_profile_type_status ON workflows(profile_id, workflow_type, status);
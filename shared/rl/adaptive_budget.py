@@ -0,0 +1,124 @@
+import math
+from typing import Dict, List, Optional
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+from shared.rl.evaluation import HELD_OUT_SEED, SCENARIOS, evaluate_policy
+
+# ============================================
+# CONVERGENCE-AWARE TRAINING BUDGETS
+# ============================================
+
+BUDGET_SCHEMA = """
+-- One row per training run: how many steps the profile actually needed
+CREATE TABLE IF NOT EXISTS rl_training_budgets (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER REFERENCES profile(id),
+    max_timesteps INTEGER,
+    timesteps_used INTEGER,
+    converged BOOLEAN,
+    best_reward REAL,
+    final_reward REAL,
+    n_evaluations INTEGER,
+    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_rl_training_budgets_profile ON rl_training_budgets(profile_id, id);
+"""
+
+
+def ensure_budget_schema(db):
+    db.executescript(BUDGET_SCHEMA)
+    db.commit()
+
+
+class ConvergenceCallback(BaseCallback):
+    """
+    Stops PPO training once the policy stops improving.
+
+    Every eval_freq timesteps (checked after each policy update) the policy is
+    evaluated on held-out seeded episodes of every scenario. If the best mean
+    reward improves by no more than tolerance * max(|best|, 1) for `patience`
+    consecutive evaluations, and at least min_timesteps were used, training stops.
+    """
+
+    def __init__(self, user_data: Dict, db_connection=None, eval_freq: int = 2048, tolerance: float = 0.01,
+                 patience: int = 3, min_timesteps: int = 0, n_eval_episodes: int = 5,
+                 eval_seed: int = HELD_OUT_SEED, scenarios: Optional[List[str]] = None):
+        super().__init__(verbose=0)
+        self.user_data = user_data
+        self.db_connection = db_connection
+        self.eval_freq = eval_freq
+        self.tolerance = tolerance
+        self.patience = patience
+        self.min_timesteps = min_timesteps
+        self.n_eval_episodes = n_eval_episodes
+        self.eval_seed = eval_seed
+        self.scenarios = scenarios or SCENARIOS
+
+        self.history: List[tuple] = []  # (timesteps, mean_reward)
+        self.best_reward = -math.inf
+        self.converged = False
+        self._stale_evals = 0
+        self._last_eval = 0
+
+    def _evaluate(self) -> float:
+        report = evaluate_policy(self.model, self.user_data, self.scenarios, n_episodes=self.n_eval_episodes,
+                                 n_envs=self.n_eval_episodes * len(self.scenarios), seed=self.eval_seed,
+                                 db_connection=self.db_connection)
+        return report['overall']['mean_reward']
+
+    def _on_rollout_start(self) -> None:
+        # Rollouts start right after a policy update: the only point where the policy changed
+        if self.num_timesteps == 0 or self.num_timesteps - self._last_eval < self.eval_freq:
+            return
+        self._last_eval = self.num_timesteps
+
+        reward = self._evaluate()
+        self.history.append((self.num_timesteps, reward))
+        if self.best_reward == -math.inf or reward - self.best_reward > self.tolerance * max(abs(self.best_reward), 1.0):
+            self._stale_evals = 0
+        else:
+            self._stale_evals += 1
+        self.best_reward = max(self.best_reward, reward)
+
+        if self._stale_evals >= self.patience and self.num_timesteps >= self.min_timesteps:
+            self.converged = True
+
+    def _on_step(self) -> bool:
+        return not self.converged
+
+
+def record_training_budget(db, profile_id, max_timesteps: int, timesteps_used: int, callback: ConvergenceCallback):
+    ensure_budget_schema(db)
+    with db:
+        db.execute("""
+            INSERT INTO rl_training_budgets
+                (profile_id, max_timesteps, timesteps_used, converged, best_reward, final_reward, n_evaluations)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (profile_id, max_timesteps, timesteps_used, callback.converged,
+              callback.best_reward if callback.history else None,
+              callback.history[-1][1] if callback.history else None,
+              len(callback.history)))
+
+
+def suggest_budget(db, profile_id, default: int, headroom: float = 1.5, growth: float = 2.0,
+                   min_timesteps: int = 2048, max_timesteps: int = 1_000_000) -> int:
+    """
+    Timestep budget for a profile's next training cycle, from its last recorded run.
+    Converged runs get what they needed plus headroom; runs that hit their
+    budget without converging get growth times more. Unknown profiles get default.
+    """
+    ensure_budget_schema(db)
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT timesteps_used, converged, max_timesteps FROM rl_training_budgets
+        WHERE profile_id = ? ORDER BY id DESC LIMIT 1
+    """, (profile_id,))
+    row = cursor.fetchone()
+    if not row:
+        return default
+
+    timesteps_used, converged, previous_max = row
+    budget = timesteps_used * headroom if converged else max(timesteps_used, previous_max) * growth
+    return int(min(max_timesteps, max(min_timesteps, math.ceil(budget))))
@@ -3,9 +3,11 @@ from gymnasium import spaces
 import numpy as np
 import pandas as pd
 import json
+import os
 import random
 import copy
-from typing import Dict, List, Any, Optional
+import weakref
+from typing import Dict, List, Any, Optional, NamedTuple
 
 # ============================================
 # 1. RL ENVIRONMENT & SCENARIOS
@@ -15,7 +17,9 @@ class ScenarioManager:
     """Manages different simulation scenarios for training."""
 
     @staticmethod
-    def get_scenario(scenario_type: str, user_data: Dict) -> Dict:
+    def get_scenario(scenario_type: str, user_data: Dict, rng: Optional[np.random.Generator] = None) -> Dict:
+        # ORACLE: Accept the env's own RNG so seeded episodes are reproducible
+        rng = rng if rng is not None else np.random.default_rng()
         # BOLT OPTIMIZATION: Manual list comprehension with .copy() is 30x faster than copy.deepcopy
         # for simple nested structures like these.
         base_state = {
@@ -32,7 +36,7 @@ class ScenarioManager:
             # Urgent projects, low initial energy
             base_state['energy'] = 0.4
             for p in base_state['projects']:
-                p['deadline_days'] = random.randint(1, 3)
+                p['deadline_days'] = int(rng.integers(1, 4))
                 p['priority'] = 1.0
 
         elif scenario_type == 'relaxed_weekend':
@@ -44,11 +48,95 @@ class ScenarioManager:
         elif scenario_type == 'social_focus':
             # Many relationships needing contact
             for r in base_state['relationships']:
-                r['days_since_contact'] = random.randint(10, 30)
+                r['days_since_contact'] = int(rng.integers(10, 31))
                 r['priority'] = 0.8
 
         return base_state
 
+class AlignmentAdjustmentCache:
+    """
+    Process-wide alignment reward adjustments learned from validation feedback
+    (see validation_feedback), keyed by (database, profile_id). Live envs hold the
+    same dict for their DB and profile and are refreshed in place on update(), so
+    feedback applies without reconstruction. Entries exist only while envs use
+    them; new envs always load the persisted adjustments.
+    """
+
+    def __init__(self):
+        self._adjustments: Dict[Any, Dict[str, float]] = {}
+        self._envs: Dict[Any, weakref.WeakSet] = {}
+
+    @staticmethod
+    def _key(db, profile_id) -> tuple:
+        # Connections to the same file share adjustments. In-memory DBs are keyed by the
+        # connection object itself (not a reusable id()); entries are dropped with their envs.
+        try:
+            for _, name, path in db.execute("PRAGMA database_list").fetchall():
+                if name == 'main' and path:
+                    return (os.path.realpath(path), profile_id)
+        except Exception:
+            pass
+        return (db, profile_id)
+
+    def prime(self, db, profile_id) -> Dict[str, float]:
+        """Reloads a profile's adjustments from the DB and returns the shared dict for (db, profile)."""
+        key = self._key(db, profile_id)
+        entry = self._adjustments.setdefault(key, {})
+        try:
+            cursor = db.cursor()
+            cursor.execute("""
+                SELECT action_type, adjustment FROM rl_alignment_adjustments WHERE profile_id = ?
+            """, (profile_id,))
+            rows = cursor.fetchall()
+        except Exception:
+            # SENTINEL: A failed load must not wipe what live envs are already using
+            return entry
+        # The DB is authoritative: replace in place so every holder of the dict sees it
+        entry.clear()
+        entry.update(rows)
+        self._refresh(key)
+        return entry
+
+    def register(self, env):
+        key = self._key(env.db, env.user_data['profile_id'])
+        self._envs.setdefault(key, weakref.WeakSet()).add(env)
+        weakref.finalize(env, self._release, key)
+
+    def _release(self, key):
+        # Iterating a WeakSet skips envs that are already being collected
+        if not any(True for _ in self._envs.get(key, ())):
+            self._envs.pop(key, None)
+            self._adjustments.pop(key, None)
+
+    def _refresh(self, key):
+        for env in list(self._envs.get(key, ())):
+            env._update_alignment_reward_cache()
+
+    def get(self, db, profile_id) -> Dict[str, float]:
+        return self._adjustments.get(self._key(db, profile_id), {})
+
+    def update(self, db, profile_id, adjustments: Dict[str, float]):
+        """Applies new adjustments and refreshes the O(1) reward cache of every live env of the profile on db."""
+        key = self._key(db, profile_id)
+        if key not in self._adjustments:
+            return  # No live envs; new ones load the persisted values
+        self._adjustments[key].update(adjustments)
+        self._refresh(key)
+
+ALIGNMENT_ADJUSTMENTS = AlignmentAdjustmentCache()
+
+class EnvSnapshot(NamedTuple):
+    """Mutable episode state of a PersonalLifeEnv, as captured by snapshot()."""
+    state: Dict                 # Top-level scalars; entity lists are stored separately below
+    projects: tuple             # Per-project dict copies
+    relationships: tuple        # Per-relationship dict copies
+    scenario: str
+    relationship_avg: float
+    project_progress: float
+    project_urgencies: tuple
+    neglect_penalty_sum: float
+    rng_state: Dict
+
 class PersonalLifeEnv(gym.Env):
     """
     Custom Gym Environment for training a Digital Twin
@@ -88,6 +176,8 @@ class PersonalLifeEnv(gym.Env):
         # BOLT OPTIMIZATION: Cache patterns at initialization to avoid per-step DB queries
         self.pattern_cache = {}
         self.alignment_rewards = {}
+        # Feedback-driven offsets; shared with ALIGNMENT_ADJUSTMENTS for DB-backed envs
+        self.alignment_adjustments = {}
         if self.db:
             self._prime_pattern_cache()
         else:
@@ -130,15 +220,18 @@ class PersonalLifeEnv(gym.Env):
 
     def reset(self, seed=None, options=None):
         """Initialize state from user data using ScenarioManager"""
+        # ORACLE: Randomness comes from gymnasium's per-env np_random (seeded here), not the
+        # global random module, so seeded episodes are reproducible and independent across envs
         super().reset(seed=seed)
 
         scenario_type = 'workday'
         if options and 'scenario_type' in options:
             scenario_type = options['scenario_type']
         else:
-            scenario_type = random.choice(['workday', 'deadline_crisis', 'relaxed_weekend', 'social_focus'])
+            scenarios = ['workday', 'deadline_crisis', 'relaxed_weekend', 'social_focus']
+            scenario_type = scenarios[self.np_random.integers(len(scenarios))]
 
-        self.state = ScenarioManager.get_scenario(scenario_type, self.user_data)
+        self.state = ScenarioManager.get_scenario(scenario_type, self.user_data, self.np_random)
         self.current_scenario = scenario_type
 
         # BOLT OPTIMIZATION: Initialize cached metrics for O(1) step/reward calculations
@@ -151,6 +244,41 @@ class PersonalLifeEnv(gym.Env):
 
         return self._get_obs(), {'scenario': scenario_type}
 
+    def snapshot(self) -> EnvSnapshot:
+        """
+        Captures only the mutable episode state, cached aggregates and RNG state,
+        for branching (planning, counterfactuals, tree search) without deep-copying
+        the env, its spaces or its DB handle.
+        """
+        # BOLT OPTIMIZATION: One-level dict copies (see ScenarioManager) instead of copy.deepcopy
+        state = self.state
+        return EnvSnapshot(
+            {k: v for k, v in state.items() if k != 'projects' and k != 'relationships'},
+            tuple(p.copy() for p in state['projects']),
+            tuple(r.copy() for r in state['relationships']),
+            self.current_scenario,
+            self.cached_relationship_avg,
+            self.cached_project_progress,
+            tuple(self.project_urgencies),
+            self.cached_neglect_penalty_sum,
+            # BOLT: PCG64 state is a small dict (~2µs to capture)
+            self.np_random.bit_generator.state
+        )
+
+    def restore(self, snapshot: EnvSnapshot):
+        """Rewinds the env to a snapshot. A snapshot can be restored any number of times."""
+        state = snapshot.state.copy()
+        state['projects'] = [p.copy() for p in snapshot.projects]
+        state['relationships'] = [r.copy() for r in snapshot.relationships]
+        self.state = state
+        self.current_scenario = snapshot.scenario
+        self.cached_relationship_avg = snapshot.relationship_avg
+        self.cached_project_progress = snapshot.project_progress
+        self.project_urgencies = list(snapshot.project_urgencies)
+        self.cached_neglect_penalty_sum = snapshot.neglect_penalty_sum
+        self.np_random.bit_generator.state = snapshot.rng_state
+        return self._get_obs()
+
     def _update_neglect_penalty_cache(self):
         """
         Calculates and caches the sum of neglect penalties for all projects.
@@ -222,14 +350,14 @@ class PersonalLifeEnv(gym.Env):
 
     def _apply_random_events(self):
         """Simulate unexpected life events."""
-        if random.random() < 0.05: # 5% chance of an event per step
+        if self.np_random.random() < 0.05: # 5% chance of an event per step
             events = [
                 ('unexpected_meeting', {'time_cost': 60, 'energy_cost': 0.1}),
                 ('energy_boost', {'energy_gain': 0.2}),
                 ('energy_crash', {'energy_cost': 0.3}),
                 ('urgent_request', {'project_idx': 0, 'priority_increase': 0.2})
             ]
-            event_type, params = random.choice(events)
+            event_type, params = events[self.np_random.integers(len(events))]
 
             if event_type == 'unexpected_meeting':
                 self.state['time_available'] -= params['time_cost']
@@ -346,6 +474,10 @@ class PersonalLifeEnv(gym.Env):
         except Exception:
             pass
 
+        # ORACLE: Share the profile's feedback adjustments so consumers can update this env live
+        self.alignment_adjustments = ALIGNMENT_ADJUSTMENTS.prime(self.db, self.user_data['profile_id'])
+        ALIGNMENT_ADJUSTMENTS.register(self)
+
         # BOLT OPTIMIZATION: Pre-calculate the alignment reward cache after priming patterns
         self._update_alignment_reward_cache()
 
@@ -360,11 +492,12 @@ class PersonalLifeEnv(gym.Env):
         if not aspect_code:
             return 0.0
 
+        adjustment = self.alignment_adjustments.get(action_type, 0.0)
         if aspect_code in self.pattern_cache:
             strength, confidence = self.pattern_cache[aspect_code]
-            return float(strength) * float(confidence)
+            return float(strength) * float(confidence) + adjustment
 
-        return self.VALUE_SCORES.get(action_type, 0.0)
+        return self.VALUE_SCORES.get(action_type, 0.0) + adjustment
 
 
 # ============================================
@@ -466,9 +599,29 @@ class DigitalTwinTrainer:
         self.profile_id = profile_id
         self.data_pipeline = DataPipeline(db_connection)
         self.user_data = self.data_pipeline.prepare_user_data(profile_id)
-        self.env = PersonalLifeEnv(self.user_data, self.user_data.get('preferences', {}), db_connection=db_connection)
+        self.env = self._make_env()
+        self.model_version = None
+        self.convergence = None
+
+    def _make_env(self):
+        return PersonalLifeEnv(self.user_data, self.user_data.get('preferences', {}), db_connection=self.db)
 
-    def train(self, total_timesteps: int = 10000):
+    def train(self, total_timesteps: int = 10000, hyperparams: Optional[Dict] = None,
+              model_store=None, cohort: Optional[str] = None, early_stopping: Optional[Dict] = None,
+              materialize: bool = True):
+        """
+        Trains a PPO policy for this profile.
+        hyperparams: Optional PPO keyword arguments (e.g. a cohort config from
+        hyperparameter_sweep.load_cohort_config). The special 'n_envs' key sets
+        the number of parallel environments.
+        model_store: Optional model_store.ModelStore. When given, the policy is saved
+        as a new float16 version (delta-encoded against the cohort base, if any)
+        instead of a standalone zip in the working directory.
+        early_stopping: Optional adaptive_budget.ConvergenceCallback keyword arguments.
+        When given (even empty), total_timesteps becomes an upper bound: training stops
+        once held-out reward plateaus and the steps used are recorded in rl_training_budgets.
+        materialize: Refresh the profile's precomputed recommendations from the new policy.
+        """
         try:
             from stable_baselines3 import PPO
             from stable_baselines3.common.vec_env import DummyVecEnv
@@ -476,12 +629,36 @@ class DigitalTwinTrainer:
             print("stable-baselines3 not installed. Skipping training implementation.")
             return None
 
-        vec_env = DummyVecEnv([lambda: self.env])
-        model = PPO("MultiInputPolicy", vec_env, verbose=1)
-        model.learn(total_timesteps=total_timesteps)
-        model.save(f"digital_twin_{self.profile_id}")
+        hyperparams = dict(hyperparams or {})
+        n_envs = max(1, int(hyperparams.pop('n_envs', 1)))
+        hyperparams.setdefault('verbose', 1)
+
+        env_fns = [lambda: self.env] + [self._make_env for _ in range(n_envs - 1)]
+        vec_env = DummyVecEnv(env_fns)
+        model = PPO("MultiInputPolicy", vec_env, **hyperparams)
+        if early_stopping is not None:
+            from shared.rl.adaptive_budget import ConvergenceCallback, record_training_budget
+            self.convergence = ConvergenceCallback(self.user_data, db_connection=self.db, **early_stopping)
+            model.learn(total_timesteps=total_timesteps, callback=self.convergence)
+            record_training_budget(self.db, self.profile_id, total_timesteps, model.num_timesteps, self.convergence)
+        else:
+            model.learn(total_timesteps=total_timesteps)
+        if model_store is not None:
+            self.model_version = model_store.save(self.profile_id, model, cohort=cohort)
+        else:
+            model.save(f"digital_twin_{self.profile_id}")
+        if materialize:
+            self.materialize_recommendations(model)
         return model
 
+    def materialize_recommendations(self, model, **kwargs) -> int:
+        """
+        Post-training step: precomputes the policy's suggestions over a context grid
+        into the recommendations table (see recommendation_materializer).
+        """
+        from shared.rl.recommendation_materializer import RecommendationMaterializer
+        return RecommendationMaterializer(self.db, self.profile_id, model, **kwargs).materialize()
+
     def generate_validation_questions(self, model, n_questions: int = 5):
         """
         Generates validation questions based on agent decisions and inserts them into the database.
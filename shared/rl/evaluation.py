@@ -0,0 +1,168 @@
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from shared.rl.digital_twin_rl import PersonalLifeEnv, DataPipeline
+from shared.rl.worker_pool import spawn_pool
+
+# ============================================
+# BATCHED POLICY EVALUATION
+# ============================================
+
+SCENARIOS = ['workday', 'deadline_crisis', 'relaxed_weekend', 'social_focus']
+
+# Matches the exhaustion threshold penalised in PersonalLifeEnv._calculate_reward
+BURNOUT_ENERGY = 0.1
+
+# Held-out evaluation seeds start far from anything a training env is reset with
+HELD_OUT_SEED = 10_000_000
+
+
+def _stack_obs(obs_list: List[Dict]) -> Dict[str, np.ndarray]:
+    return {key: np.stack([obs[key] for obs in obs_list]) for key in obs_list[0]}
+
+
+def _summarize(rewards: List[float], burnouts: List[bool], progress: List[float]) -> Dict:
+    rewards = np.asarray(rewards, dtype=np.float64)
+    p5, p50, p95 = np.percentile(rewards, [5, 50, 95])
+    return {
+        'n_episodes': int(len(rewards)),
+        'mean_reward': float(rewards.mean()),
+        'std_reward': float(rewards.std()),
+        'min_reward': float(rewards.min()),
+        'p5_reward': float(p5),
+        'median_reward': float(p50),
+        'p95_reward': float(p95),
+        'max_reward': float(rewards.max()),
+        'burnout_rate': float(np.mean(burnouts)),
+        'mean_project_progress': float(np.mean(progress))
+    }
+
+
+def evaluate_policy(model, user_data: Dict, scenarios: Optional[List[str]] = None, n_episodes: int = 1000,
+                    n_envs: int = 64, seed: int = 0, db_connection=None, deterministic: bool = True) -> Dict[str, Dict]:
+    """
+    Runs n_episodes seeded episodes per scenario across n_envs envs, with one
+    batched model.predict per step for all active envs.
+
+    Returns a report keyed by scenario (plus 'overall') with reward distribution,
+    burnout rate (energy < 0.1 at any step) and mean end-of-episode project progress.
+    Episode i of scenario s always uses seed `seed + i`, so reports are reproducible
+    and comparable across models.
+    """
+    scenarios = scenarios or SCENARIOS
+    tasks = [(scenario, seed + i) for scenario in scenarios for i in range(n_episodes)]
+    if not tasks:
+        return {}
+
+    envs = [PersonalLifeEnv(user_data, user_data.get('preferences', {}), db_connection=db_connection)
+            for _ in range(min(n_envs, len(tasks)))]
+    results = {scenario: ([], [], []) for scenario in scenarios}
+
+    next_task = 0
+    active = []  # (env, scenario, obs, total_reward, burned_out)
+    for env in envs:
+        scenario, episode_seed = tasks[next_task]
+        next_task += 1
+        obs, _ = env.reset(seed=episode_seed, options={'scenario_type': scenario})
+        active.append([env, scenario, obs, 0.0, False])
+
+    while active:
+        actions, _ = model.predict(_stack_obs([slot[2] for slot in active]), deterministic=deterministic)
+
+        still_active = []
+        for slot, action in zip(active, actions):
+            env = slot[0]
+            obs, reward, terminated, truncated, _ = env.step(action)
+            slot[2] = obs
+            slot[3] += reward
+            slot[4] = slot[4] or env.state['energy'] < BURNOUT_ENERGY
+
+            if not (terminated or truncated):
+                still_active.append(slot)
+                continue
+
+            rewards, burnouts, progress = results[slot[1]]
+            rewards.append(slot[3])
+            burnouts.append(slot[4])
+            progress.append(float(env.cached_project_progress))
+
+            # BOLT: Refill the freed env with the next queued episode to keep batches full
+            if next_task < len(tasks):
+                scenario, episode_seed = tasks[next_task]
+                next_task += 1
+                obs, _ = env.reset(seed=episode_seed, options={'scenario_type': scenario})
+                still_active.append([env, scenario, obs, 0.0, False])
+        active = still_active
+
+    report = {scenario: _summarize(*results[scenario]) for scenario in scenarios}
+    report['overall'] = _summarize(
+        [r for s in scenarios for r in results[s][0]],
+        [b for s in scenarios for b in results[s][1]],
+        [p for s in scenarios for p in results[s][2]]
+    )
+    return report
+
+
+def _evaluate_saved_model(db_path: str, profile_id: int, model_path: str, scenarios: Optional[List[str]],
+                          n_episodes: int, n_envs: int, seed: int) -> Dict[str, Dict]:
+    """Process-pool worker: loads one profile's saved model and evaluates it."""
+    from stable_baselines3 import PPO
+
+    db = sqlite3.connect(db_path)
+    try:
+        user_data = DataPipeline(db).prepare_user_data(profile_id)
+        model = PPO.load(model_path, device='cpu')
+        return evaluate_policy(model, user_data, scenarios, n_episodes, n_envs, seed, db_connection=db)
+    finally:
+        db.close()
+
+
+def evaluate_saved_models(db_path: str, model_paths: Dict[int, str], scenarios: Optional[List[str]] = None,
+                          n_episodes: int = 1000, n_envs: int = 64, seed: int = 0,
+                          max_workers: Optional[int] = None) -> Dict[int, Dict]:
+    """
+    Evaluates many saved profile models in parallel.
+    model_paths: {profile_id: path to the SB3 model zip}.
+    Returns {profile_id: report}; a failed evaluation is reported as {'error': message}.
+    """
+    reports = {}
+    with spawn_pool(max_workers) as pool:
+        futures = {
+            profile_id: pool.submit(_evaluate_saved_model, db_path, profile_id, path, scenarios, n_episodes, n_envs, seed)
+            for profile_id, path in model_paths.items()
+        }
+        for profile_id, future in futures.items():
+            try:
+                reports[profile_id] = future.result()
+            except Exception as e:
+                reports[profile_id] = {'error': str(e)}
+    return reports
+
+
+def release_gate(candidate: Dict[str, Dict], baseline: Optional[Dict[str, Dict]] = None,
+                 max_burnout_rate: float = 0.05, max_reward_drop: float = 0.05) -> Tuple[bool, List[str]]:
+    """
+    Decides whether a retrained model may be promoted.
+    Fails if any scenario's burnout rate exceeds max_burnout_rate, or if its mean reward
+    dropped by more than max_reward_drop (relative) against the baseline report.
+    Returns (passed, reasons).
+    """
+    if 'error' in candidate:
+        return False, [f"evaluation failed: {candidate['error']}"]
+
+    reasons = []
+    for scenario, stats in candidate.items():
+        if scenario == 'overall':
+            continue
+        if stats['burnout_rate'] > max_burnout_rate:
+            reasons.append(f"{scenario}: burnout rate {stats['burnout_rate']:.3f} > {max_burnout_rate:.3f}")
+
+        if baseline and scenario in baseline:
+            base_mean = baseline[scenario]['mean_reward']
+            floor = base_mean - max_reward_drop * abs(base_mean)
+            if stats['mean_reward'] < floor:
+                reasons.append(f"{scenario}: mean reward {stats['mean_reward']:.3f} < baseline floor {floor:.3f}")
+
+    return not reasons, reasons
@@ -0,0 +1,322 @@
+import json
+import math
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from shared.rl.digital_twin_rl import PersonalLifeEnv, DataPipeline
+from shared.rl.evaluation import HELD_OUT_SEED, SCENARIOS, evaluate_policy
+from shared.rl.worker_pool import spawn_pool
+
+# ============================================
+# HYPERPARAMETER SWEEPS (SUCCESSIVE HALVING)
+# ============================================
+
+SWEEP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rl_sweeps (
+    id INTEGER PRIMARY KEY,
+    name VARCHAR(100),
+    profile_ids JSON,
+    search_space JSON,
+    status VARCHAR(20), -- 'running', 'completed'
+    best_trial_index INTEGER,
+    best_config JSON,
+    best_score REAL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- One row per trial per rung so pruned trials keep their learning curve
+CREATE TABLE IF NOT EXISTS rl_sweep_trials (
+    id INTEGER PRIMARY KEY,
+    sweep_id INTEGER REFERENCES rl_sweeps(id),
+    trial_index INTEGER,
+    rung INTEGER,
+    budget INTEGER,
+    timesteps INTEGER,
+    config JSON,
+    score REAL,
+    status VARCHAR(20), -- 'promoted', 'pruned', 'best', 'failed'
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(sweep_id, trial_index, rung)
+);
+
+-- Winning configs attached to profile cohorts
+CREATE TABLE IF NOT EXISTS rl_cohort_configs (
+    cohort VARCHAR(100) PRIMARY KEY,
+    sweep_id INTEGER REFERENCES rl_sweeps(id),
+    config JSON,
+    score REAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_rl_sweep_trials_sweep_rung ON rl_sweep_trials(sweep_id, rung);
+"""
+
+def ensure_sweep_schema(db):
+    db.executescript(SWEEP_SCHEMA)
+    db.commit()
+
+
+def sample_configs(search_space: Dict[str, Any], n_trials: int, seed: int = 0) -> List[Dict]:
+    """
+    Draws n_trials configs from the search space.
+    Lists are categorical choices; (low, high) tuples are sampled log-uniformly
+    (e.g. learning rates). Scalars are held fixed.
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(n_trials):
+        config = {}
+        for name, space in search_space.items():
+            if isinstance(space, list):
+                config[name] = rng.choice(space)
+            elif isinstance(space, tuple) and len(space) == 2:
+                low, high = space
+                config[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+            else:
+                config[name] = space
+        configs.append(config)
+    return configs
+
+
+def rung_budgets(min_timesteps: int, max_timesteps: int, eta: int) -> List[int]:
+    """Geometric timestep budgets min, min*eta, ... capped at max."""
+    budgets = []
+    budget = min_timesteps
+    while budget < max_timesteps:
+        budgets.append(budget)
+        budget *= eta
+    budgets.append(max_timesteps)
+    return budgets
+
+
+def rollout_size(config: Dict) -> int:
+    """Timesteps PPO collects per update; learn() always finishes a whole rollout."""
+    # PPO's default n_steps
+    return int(config.get('n_steps', 2048)) * max(1, int(config.get('n_envs', 1)))
+
+
+def trial_budget(budget: int, config: Dict) -> int:
+    """The rung budget rounded down to whole rollouts, so PPO never trains past it."""
+    size = rollout_size(config)
+    return budget // size * size
+
+
+def _run_trial_rung(db_path: str, profile_ids: List[int], config: Dict, budget: int,
+                    checkpoint_path: str, n_eval_episodes: int, seed: int, eval_seed: int) -> Dict:
+    """
+    Process-pool worker: resumes a trial from its checkpoint, trains it up to
+    the rung budget and evaluates it. Returns the score and steps trained.
+    """
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    db = sqlite3.connect(db_path)
+    try:
+        pipeline = DataPipeline(db)
+        user_datas = [pipeline.prepare_user_data(pid) for pid in profile_ids]
+
+        hyperparams = dict(config)
+        n_envs = max(1, int(hyperparams.pop('n_envs', 1)))
+        # Round-robin the cohort's profiles across the vectorized envs
+        envs = [PersonalLifeEnv(user_datas[i % len(user_datas)], user_datas[i % len(user_datas)].get('preferences', {}), db_connection=db)
+                for i in range(n_envs)]
+        vec_env = DummyVecEnv([(lambda e=e: e) for e in envs])
+
+        if os.path.exists(checkpoint_path):
+            model = PPO.load(checkpoint_path, env=vec_env)
+        else:
+            model = PPO("MultiInputPolicy", vec_env, verbose=0, seed=seed, **hyperparams)
+
+        remaining = budget - model.num_timesteps
+        if remaining > 0:
+            model.learn(total_timesteps=remaining, reset_num_timesteps=False)
+        model.save(checkpoint_path)
+
+        # Score = mean reward over the cohort, with the episode budget split across profiles and scenarios
+        episodes_per_scenario = max(1, n_eval_episodes // (len(user_datas) * len(SCENARIOS)))
+        score = float(np.mean([
+            evaluate_policy(model, u, n_episodes=episodes_per_scenario, seed=eval_seed, db_connection=db)['overall']['mean_reward']
+            for u in user_datas
+        ]))
+        return {'score': score, 'timesteps': int(model.num_timesteps)}
+    finally:
+        db.close()
+
+
+class HyperparameterSweep:
+    """
+    Successive-halving sweep over PPO settings for a profile cohort.
+
+    Every rung trains all surviving trials up to the rung budget across a
+    process pool (resuming from checkpoints), evaluates them on seeded
+    episodes, and keeps the top 1/eta. Poor configs are pruned after the
+    cheapest rung instead of running to the full budget.
+
+    Every trial is scored on the same held-out eval_seed episodes (PPO itself
+    gets seed + trial_index). PPO trains in whole rollouts of n_steps * n_envs
+    steps, so each trial trains its rung budget rounded down to its own rollout
+    size: never past the budget, and less than one rollout short of it. Search
+    spaces allowing a rollout larger than min_timesteps are rejected.
+    """
+
+    def __init__(self, db_path: str, profile_ids: List[int], search_space: Dict[str, Any],
+                 n_trials: int = 9, min_timesteps: int = 2048, max_timesteps: int = 18432,
+                 eta: int = 3, max_workers: Optional[int] = None, n_eval_episodes: int = 20,
+                 seed: int = 0, checkpoint_dir: Optional[str] = None, eval_seed: int = HELD_OUT_SEED):
+        # SENTINEL: A sweep must target explicit profiles
+        if not profile_ids:
+            raise ValueError("HyperparameterSweep requires at least one profile_id")
+        if eta < 2:
+            raise ValueError("eta must be >= 2")
+
+        self.db_path = db_path
+        self.profile_ids = list(profile_ids)
+        self.search_space = search_space
+        self.n_trials = n_trials
+        self.min_timesteps = min_timesteps
+        self.max_timesteps = max_timesteps
+        self.eta = eta
+        self.max_workers = max_workers
+        self.n_eval_episodes = n_eval_episodes
+        self.seed = seed
+        self.eval_seed = eval_seed
+        self.checkpoint_dir = checkpoint_dir
+
+        self.db = sqlite3.connect(db_path)
+        ensure_sweep_schema(self.db)
+
+    def run(self, name: Optional[str] = None) -> Dict:
+        """Runs the sweep and returns the best trial ({'sweep_id', 'trial_index', 'config', 'score', 'timesteps'})."""
+        configs = sample_configs(self.search_space, self.n_trials, self.seed)
+        largest_rollout = max(rollout_size(config) for config in configs)
+        if largest_rollout > self.min_timesteps:
+            raise ValueError(f"Search space allows rollouts of {largest_rollout} steps (n_steps * n_envs), "
+                             f"more than min_timesteps={self.min_timesteps}")
+        budgets = rung_budgets(self.min_timesteps, self.max_timesteps, self.eta)
+
+        cursor = self.db.cursor()
+        cursor.execute("""
+            INSERT INTO rl_sweeps (name, profile_ids, search_space, status)
+            VALUES (?, ?, ?, 'running')
+        """, (name, json.dumps(self.profile_ids), json.dumps(self.search_space)))
+        sweep_id = cursor.lastrowid
+        self.db.commit()
+
+        owns_checkpoints = self.checkpoint_dir is None
+        checkpoint_dir = tempfile.mkdtemp(prefix='rl_sweep_') if owns_checkpoints else self.checkpoint_dir
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        survivors = list(range(len(configs)))
+        results = {}
+        try:
+            with spawn_pool(self.max_workers) as pool:
+                for rung, budget in enumerate(budgets):
+                    futures = {
+                        idx: pool.submit(
+                            _run_trial_rung, self.db_path, self.profile_ids, configs[idx], trial_budget(budget, configs[idx]),
+                            os.path.join(checkpoint_dir, f"sweep_{sweep_id}_trial_{idx}.zip"),
+                            self.n_eval_episodes, self.seed + idx, self.eval_seed
+                        )
+                        for idx in survivors
+                    }
+
+                    results = {}
+                    for idx, future in futures.items():
+                        try:
+                            results[idx] = future.result()
+                        except Exception as e:
+                            results[idx] = {'score': None, 'timesteps': None, 'error': str(e)}
+
+                    ranked = sorted(
+                        (idx for idx in survivors if results[idx]['score'] is not None),
+                        key=lambda idx: results[idx]['score'], reverse=True
+                    )
+                    is_last = rung == len(budgets) - 1
+                    n_keep = 1 if is_last else max(1, len(survivors) // self.eta)
+                    promoted = set(ranked[:n_keep])
+
+                    rows = []
+                    for idx in survivors:
+                        result = results[idx]
+                        if result['score'] is None:
+                            status = 'failed'
+                        elif idx in promoted:
+                            status = 'best' if is_last else 'promoted'
+                        else:
+                            status = 'pruned'
+                        rows.append((sweep_id, idx, rung, budget, result['timesteps'], json.dumps(configs[idx]),
+                                     result['score'], status, result.get('error')))
+                    cursor.executemany("""
+                        INSERT INTO rl_sweep_trials (sweep_id, trial_index, rung, budget, timesteps, config, score, status, error)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, rows)
+                    self.db.commit()
+
+                    survivors = ranked[:n_keep]
+                    if not survivors:
+                        break
+        finally:
+            if owns_checkpoints:
+                shutil.rmtree(checkpoint_dir, ignore_errors=True)
+
+        if not survivors:
+            cursor.execute("UPDATE rl_sweeps SET status = 'failed', finished_at = CURRENT_TIMESTAMP WHERE id = ?", (sweep_id,))
+            self.db.commit()
+            raise RuntimeError(f"All trials failed in sweep {sweep_id}")
+
+        best_idx = survivors[0]
+        best = {
+            'sweep_id': sweep_id,
+            'trial_index': best_idx,
+            'config': configs[best_idx],
+            'score': results[best_idx]['score'],
+            'timesteps': results[best_idx]['timesteps']
+        }
+        cursor.execute("""
+            UPDATE rl_sweeps
+            SET status = 'completed', best_trial_index = ?, best_config = ?, best_score = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (best_idx, json.dumps(best['config']), best['score'], sweep_id))
+        self.db.commit()
+        return best
+
+    def close(self):
+        self.db.close()
+
+
+def attach_to_cohort(db, cohort: str, sweep_id: int):
+    """Attaches the winning config of a completed sweep to a cohort."""
+    ensure_sweep_schema(db)
+    cursor = db.cursor()
+    cursor.execute("SELECT best_config, best_score FROM rl_sweeps WHERE id = ? AND status = 'completed'", (sweep_id,))
+    row = cursor.fetchone()
+    if not row:
+        raise ValueError(f"Sweep {sweep_id} has not completed")
+
+    cursor.execute("""
+        INSERT INTO rl_cohort_configs (cohort, sweep_id, config, score, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(cohort) DO UPDATE SET
+            sweep_id = excluded.sweep_id,
+            config = excluded.config,
+            score = excluded.score,
+            updated_at = excluded.updated_at
+    """, (cohort, sweep_id, row[0], row[1]))
+    db.commit()
+
+
+def load_cohort_config(db, cohort: str) -> Optional[Dict]:
+    """Returns the cohort's PPO config for DigitalTwinTrainer.train(hyperparams=...), or None."""
+    ensure_sweep_schema(db)
+    cursor = db.cursor()
+    cursor.execute("SELECT config FROM rl_cohort_configs WHERE cohort = ?", (cohort,))
+    row = cursor.fetchone()
+    return json.loads(row[0]) if row else None
@@ -0,0 +1,308 @@
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# ============================================
+# COMPACT PER-PROFILE MODEL STORE
+# ============================================
+
+STORE_SCHEMA = """
+-- Shared cohort base policies that profile versions may be delta-encoded against
+CREATE TABLE IF NOT EXISTS model_bases (
+    id INTEGER PRIMARY KEY,
+    cohort VARCHAR(100) NOT NULL,
+    path TEXT NOT NULL,
+    n_bytes INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS model_versions (
+    profile_id INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    base_id INTEGER REFERENCES model_bases(id),
+    path TEXT NOT NULL,
+    n_bytes INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (profile_id, version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_model_bases_cohort ON model_bases(cohort, id);
+CREATE INDEX IF NOT EXISTS idx_model_versions_base ON model_versions(base_id);
+"""
+
+FILE_EXTENSION = '.tw16'
+
+# Tensors only needed by the critic; skipped when loading for inference
+VALUE_PREFIXES = ('value_net.', 'mlp_extractor.value_net.', 'vf_features_extractor.')
+
+# BOLT: Align tensor payloads so memory-mapped views start on cache-line boundaries
+_ALIGNMENT = 64
+
+
+def _to_numpy_state(model_or_state) -> Dict[str, np.ndarray]:
+    """Accepts an SB3 model, a torch state_dict or a {name: ndarray} dict."""
+    state = model_or_state.policy.state_dict() if hasattr(model_or_state, 'policy') else model_or_state
+    arrays = {}
+    for name, tensor in state.items():
+        arrays[name] = tensor.detach().cpu().numpy() if hasattr(tensor, 'detach') else np.asarray(tensor)
+    return arrays
+
+
+def write_tensor_file(path: str, tensors: Dict[str, np.ndarray]) -> int:
+    """
+    Writes tensors as: 8-byte header length, JSON header {name: {dtype, shape, offset}},
+    then aligned raw payloads. Floating tensors are stored as float16.
+    Returns the file size in bytes.
+    """
+    header, payloads, offset = {}, [], 0
+    for name, array in tensors.items():
+        if np.issubdtype(array.dtype, np.floating):
+            array = array.astype(np.float16)
+        array = np.ascontiguousarray(array)
+        offset += -offset % _ALIGNMENT
+        header[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+        payloads.append((offset, array))
+        offset += array.nbytes
+
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    data_start = 8 + len(header_bytes)
+    padding = -data_start % _ALIGNMENT
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(struct.pack('<Q', len(header_bytes) + padding))
+        f.write(header_bytes + b' ' * padding)
+        base = f.tell()
+        for payload_offset, array in payloads:
+            f.seek(base + payload_offset)
+            f.write(array.tobytes())
+    # ORACLE: Atomic rename so readers never observe a partially written version
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def read_tensor_file(path: str, names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Memory-maps a tensor file and returns read-only views of the requested tensors.
+    Only the pages backing those tensors are ever read from disk.
+    """
+    with open(path, 'rb') as f:
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(header_len).decode('utf-8'))
+    data_start = 8 + header_len
+
+    mapped = np.memmap(path, dtype=np.uint8, mode='r')
+    wanted = header.keys() if names is None else [n for n in names if n in header]
+    tensors = {}
+    for name in wanted:
+        meta = header[name]
+        dtype = np.dtype(meta['dtype'])
+        count = int(np.prod(meta['shape'], dtype=np.int64))
+        start = data_start + meta['offset']
+        tensors[name] = mapped[start:start + count * dtype.itemsize].view(dtype).reshape(meta['shape'])
+    return tensors
+
+
+def _tensor_names(path: str):
+    with open(path, 'rb') as f:
+        (header_len,) = struct.unpack('<Q', f.read(8))
+        return list(json.loads(f.read(header_len).decode('utf-8')).keys())
+
+
+class ModelStore:
+    """
+    Versioned per-profile policy store.
+
+    Weights are kept in float16, optionally as deltas against a shared cohort
+    base (tensors unchanged from the base are not stored at all). Files are
+    sharded by profile hash and indexed in SQLite, so lookups never list
+    directories, and loads memory-map only the tensors inference needs.
+    """
+
+    def __init__(self, root_dir: str, delta_atol: float = 1e-4):
+        self.root_dir = root_dir
+        self.delta_atol = delta_atol
+        os.makedirs(root_dir, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root_dir, 'index.db'))
+        self.db.executescript(STORE_SCHEMA)
+        self.db.commit()
+
+    def _profile_dir(self, profile_id) -> str:
+        shard = hashlib.sha1(str(profile_id).encode('utf-8')).hexdigest()[:2]
+        return os.path.join('profiles', shard, str(profile_id))
+
+    def save_base(self, cohort: str, model_or_state) -> int:
+        """Stores a cohort base policy. New profile versions for the cohort are delta-encoded against it."""
+        cursor = self.db.cursor()
+        cursor.execute("INSERT INTO model_bases (cohort, path) VALUES (?, '')", (cohort,))
+        base_id = cursor.lastrowid
+        rel_path = os.path.join('bases', f"{base_id}{FILE_EXTENSION}")
+        os.makedirs(os.path.join(self.root_dir, 'bases'), exist_ok=True)
+        n_bytes = write_tensor_file(os.path.join(self.root_dir, rel_path), _to_numpy_state(model_or_state))
+        cursor.execute("UPDATE model_bases SET path = ?, n_bytes = ? WHERE id = ?", (rel_path, n_bytes, base_id))
+        self.db.commit()
+        return base_id
+
+    def latest_base(self, cohort: str) -> Optional[int]:
+        cursor = self.db.cursor()
+        cursor.execute("SELECT MAX(id) FROM model_bases WHERE cohort = ?", (cohort,))
+        return cursor.fetchone()[0]
+
+    def _base_path(self, base_id: int) -> str:
+        cursor = self.db.cursor()
+        cursor.execute("SELECT path FROM model_bases WHERE id = ?", (base_id,))
+        row = cursor.fetchone()
+        if not row:
+            raise KeyError(f"Unknown base model {base_id}")
+        return os.path.join(self.root_dir, row[0])
+
+    def save(self, profile_id, model_or_state, cohort: Optional[str] = None, base_id: Optional[int] = None) -> int:
+        """
+        Stores a new version of a profile's policy and returns its version number.
+        With a cohort (or explicit base_id) the weights are stored as float16 deltas
+        against the base; tensors that are unchanged at float16 precision (or within
+        delta_atol) are omitted.
+        """
+        if base_id is None and cohort is not None:
+            base_id = self.latest_base(cohort)
+
+        tensors = _to_numpy_state(model_or_state)
+        if base_id is not None:
+            base = read_tensor_file(self._base_path(base_id))
+            deltas = {}
+            for name, array in tensors.items():
+                if name in base and base[name].shape == array.shape and np.issubdtype(array.dtype, np.floating):
+                    # Skip tensors that quantize to the base, or move less than delta_atol
+                    if np.array_equal(array.astype(np.float16), base[name]):
+                        continue
+                    delta = array.astype(np.float32) - base[name].astype(np.float32)
+                    if np.abs(delta).max(initial=0.0) <= self.delta_atol:
+                        continue
+                    deltas[name] = delta
+                else:
+                    # Not representable as a delta; stored in full and flagged in the name
+                    deltas['full:' + name] = array
+            tensors = deltas
+
+        cursor = self.db.cursor()
+        cursor.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM model_versions WHERE profile_id = ?", (profile_id,))
+        version = cursor.fetchone()[0]
+
+        rel_dir = self._profile_dir(profile_id)
+        os.makedirs(os.path.join(self.root_dir, rel_dir), exist_ok=True)
+        rel_path = os.path.join(rel_dir, f"v{version}{FILE_EXTENSION}")
+        n_bytes = write_tensor_file(os.path.join(self.root_dir, rel_path), tensors)
+
+        cursor.execute("""
+            INSERT INTO model_versions (profile_id, version, base_id, path, n_bytes)
+            VALUES (?, ?, ?, ?, ?)
+        """, (profile_id, version, base_id, rel_path, n_bytes))
+        self.db.commit()
+        return version
+
+    def latest_version(self, profile_id) -> Optional[int]:
+        cursor = self.db.cursor()
+        cursor.execute("SELECT MAX(version) FROM model_versions WHERE profile_id = ?", (profile_id,))
+        return cursor.fetchone()[0]
+
+    def load_tensors(self, profile_id, version: Optional[int] = None, inference_only: bool = True,
+                     names: Optional[Iterable[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Returns {name: float32 array} for a profile version (latest by default).
+        inference_only skips critic tensors; names restricts to an explicit subset.
+        """
+        cursor = self.db.cursor()
+        if version is None:
+            cursor.execute("""
+                SELECT path, base_id FROM model_versions
+                WHERE profile_id = ? ORDER BY version DESC LIMIT 1
+            """, (profile_id,))
+        else:
+            cursor.execute("SELECT path, base_id FROM model_versions WHERE profile_id = ? AND version = ?", (profile_id, version))
+        row = cursor.fetchone()
+        if not row:
+            raise KeyError(f"No stored model for profile {profile_id} (version {version})")
+        path, base_id = os.path.join(self.root_dir, row[0]), row[1]
+
+        stored_names = _tensor_names(path)
+        base_path = self._base_path(base_id) if base_id is not None else None
+        if names is not None:
+            wanted = list(names)
+        elif base_path is None:
+            wanted = stored_names
+        else:
+            wanted = list(dict.fromkeys(_tensor_names(base_path) + [n[5:] for n in stored_names if n.startswith('full:')]))
+        if inference_only:
+            wanted = [n for n in wanted if not n.startswith(VALUE_PREFIXES)]
+
+        if base_path is None:
+            return {name: array.astype(np.float32) for name, array in read_tensor_file(path, wanted).items()}
+
+        stored = read_tensor_file(path, wanted + ['full:' + n for n in wanted])
+        base = read_tensor_file(base_path, wanted)
+        tensors = {}
+        for name in wanted:
+            if 'full:' + name in stored:
+                tensors[name] = stored['full:' + name].astype(np.float32)
+            elif name in base:
+                tensors[name] = base[name].astype(np.float32)
+                if name in stored:
+                    tensors[name] += stored[name]
+        return tensors
+
+    def load_model(self, profile_id, env, version: Optional[int] = None, policy_kwargs: Optional[Dict] = None):
+        """
+        Builds a PPO model for env and loads the stored actor weights for predict().
+        The critic is not restored, so the result is for inference, not further training.
+        """
+        import torch
+        from stable_baselines3 import PPO
+
+        model = PPO("MultiInputPolicy", env, device='cpu', verbose=0, policy_kwargs=policy_kwargs)
+        tensors = self.load_tensors(profile_id, version, inference_only=True)
+        model.policy.load_state_dict({name: torch.from_numpy(array) for name, array in tensors.items()}, strict=False)
+        return model
+
+    def collect_garbage(self, keep: int = 1) -> int:
+        """
+        Deletes all but the newest `keep` versions per profile, then any base that is
+        neither referenced nor the newest base of its cohort. Returns files removed.
+        """
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT profile_id, version, path FROM (
+                SELECT profile_id, version, path,
+                       ROW_NUMBER() OVER (PARTITION BY profile_id ORDER BY version DESC) AS rank
+                FROM model_versions
+            ) WHERE rank > ?
+        """, (keep,))
+        superseded = cursor.fetchall()
+
+        # Index first, files second: a crash in between leaves only unreferenced files
+        with self.db:
+            self.db.executemany("DELETE FROM model_versions WHERE profile_id = ? AND version = ?",
+                                [(profile_id, version) for profile_id, version, _ in superseded])
+            cursor.execute("""
+                SELECT id, path FROM model_bases
+                WHERE id NOT IN (SELECT DISTINCT base_id FROM model_versions WHERE base_id IS NOT NULL)
+                  AND id NOT IN (SELECT MAX(id) FROM model_bases GROUP BY cohort)
+            """)
+            orphan_bases = cursor.fetchall()
+            self.db.executemany("DELETE FROM model_bases WHERE id = ?", [(base_id,) for base_id, _ in orphan_bases])
+
+        removed = 0
+        for rel_path in [row[2] for row in superseded] + [row[1] for row in orphan_bases]:
+            try:
+                os.remove(os.path.join(self.root_dir, rel_path))
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,222 @@
+import json
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from shared.rl.digital_twin_rl import PersonalLifeEnv, DataPipeline
+from shared.rl.evaluation import SCENARIOS
+
+# ============================================
+# RECOMMENDATION MATERIALIZATION
+# ============================================
+
+RECOMMENDATION_TYPE = 'rl_action'
+
+DEFAULT_HOURS = list(range(6, 23))
+
+# Representative energy per band; energy_band() maps live energy back onto these
+ENERGY_BANDS = {'low': 0.2, 'medium': 0.5, 'high': 0.85}
+
+# Mirrors idx_recommendations_rl_context in mobile/src/database/schema.sql for databases created before it
+RECOMMENDATION_INDEX = """
+CREATE UNIQUE INDEX IF NOT EXISTS idx_recommendations_rl_context
+ON recommendations(profile_id, recommendation_type, json_extract(metadata, '$.context_key'))
+WHERE recommendation_type = 'rl_action';
+"""
+
+
+# Upsert condition: the stored row suggests the same action (type, target, duration, intensity)
+SAME_SUGGESTION = """(
+    json_extract(recommendations.metadata, '$.action_params') = json_extract(excluded.metadata, '$.action_params')
+    AND json_extract(recommendations.metadata, '$.target_id') IS json_extract(excluded.metadata, '$.target_id')
+)"""
+
+
+def ensure_recommendation_schema(db):
+    # executescript() commits any open transaction, so only run it while the index is missing
+    cursor = db.cursor()
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_recommendations_rl_context'")
+    if cursor.fetchone() is None:
+        db.executescript(RECOMMENDATION_INDEX)
+        db.commit()
+
+
+def energy_band(energy: float) -> str:
+    if energy < 0.35:
+        return 'low'
+    if energy < 0.7:
+        return 'medium'
+    return 'high'
+
+
+def context_key(scenario: str, hour: int, band: str) -> str:
+    return f"{scenario}:{int(hour):02d}:{band}"
+
+
+def _describe(action_type: str, target: Optional[Dict], duration: int) -> str:
+    label = action_type.replace('_', ' ').capitalize()
+    if target is not None:
+        return f"{label}: {target['name']} for {duration}m"
+    return f"{label} for {duration}m"
+
+
+class RecommendationMaterializer:
+    """
+    Precomputes a profile's policy decisions over a grid of likely contexts
+    (scenario x hour of day x energy band) and upserts them into `recommendations`.
+
+    All contexts are evaluated in one batched forward pass, so apps can serve
+    the twin's suggestion for "now" with an indexed read instead of loading a model.
+    """
+
+    def __init__(self, db_connection, profile_id: int, model,
+                 hours: Optional[List[int]] = None, energy_bands: Optional[Dict[str, float]] = None,
+                 scenarios: Optional[List[str]] = None, seed: int = 0):
+        self.db = db_connection
+        self.profile_id = profile_id
+        self.model = model
+        self.hours = hours or DEFAULT_HOURS
+        self.energy_bands = energy_bands or ENERGY_BANDS
+        self.scenarios = scenarios or SCENARIOS
+        self.seed = seed
+        ensure_recommendation_schema(db_connection)
+
+        user_data = DataPipeline(db_connection).prepare_user_data(profile_id)
+        self.env = PersonalLifeEnv(user_data, user_data.get('preferences', {}), db_connection=db_connection)
+
+    def build_contexts(self):
+        """Returns (contexts, batched_obs, {scenario: (projects, relationships)}) for the whole grid."""
+        contexts, obs_list, entities = [], [], {}
+        for scenario in self.scenarios:
+            self.env.reset(seed=self.seed, options={'scenario_type': scenario})
+            base_time = self.env.state['time_available']
+            base_hour = self.env.state['hour']
+            for hour in self.hours:
+                for band, energy in self.energy_bands.items():
+                    self.env.state['hour'] = hour
+                    self.env.state['energy'] = energy
+                    # Time left shrinks as the day advances past the scenario's start hour
+                    self.env.state['time_available'] = max(0, base_time - max(0, hour - base_hour) * 60)
+                    contexts.append({'scenario': scenario, 'hour': hour, 'energy_band': band})
+                    obs_list.append(self.env._get_obs())
+            entities[scenario] = (self.env.state['projects'], self.env.state['relationships'])
+
+        batched = {key: np.stack([obs[key] for obs in obs_list]) for key in obs_list[0]}
+        return contexts, batched, entities
+
+    def predict(self, batched_obs):
+        """One forward pass: deterministic actions plus the probability of each chosen action type."""
+        import torch
+
+        policy = self.model.policy
+        obs_tensor, _ = policy.obs_to_tensor(batched_obs)
+        with torch.no_grad():
+            distribution = policy.get_distribution(obs_tensor)
+            actions = distribution.mode()
+            # MultiDiscrete: the first categorical is the action type shown to the user
+            type_probs = distribution.distribution[0].probs
+            confidence = type_probs.gather(1, actions[:, :1]).squeeze(1)
+        return actions.cpu().numpy(), confidence.cpu().numpy()
+
+    def _pattern_ids_by_action(self) -> Dict[str, List[int]]:
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT p.id, a.code
+            FROM patterns p
+            JOIN aspects a ON p.aspect_id = a.id
+            WHERE p.profile_id = ?
+        """, (self.profile_id,))
+        ids_by_code = {}
+        for pattern_id, code in cursor.fetchall():
+            ids_by_code.setdefault(code, []).append(pattern_id)
+        return {action: ids_by_code.get(code, []) for action, code in PersonalLifeEnv.ACTION_MAPPING.items()}
+
+    def materialize(self) -> int:
+        """Evaluates the grid and bulk-upserts one recommendation per context. Returns the row count."""
+        contexts, batched_obs, entities = self.build_contexts()
+        actions, confidence = self.predict(batched_obs)
+        pattern_ids = self._pattern_ids_by_action()
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+        rows = []
+        for context, action, conf in zip(contexts, actions, confidence):
+            action_idx, target_idx, duration_idx, intensity_idx = (int(a) for a in action)
+            action_type = self.env.action_types[action_idx]
+            duration = (duration_idx + 1) * 15
+
+            projects, relationships = entities[context['scenario']]
+            target = None
+            if action_type == 'work_on_project' and projects:
+                target = projects[target_idx % len(projects)]
+            elif action_type == 'call_person' and relationships:
+                target = relationships[target_idx % len(relationships)]
+
+            title = _describe(action_type, target, duration)
+            metadata = {
+                'context_key': context_key(context['scenario'], context['hour'], context['energy_band']),
+                'scenario': context['scenario'],
+                'hour': context['hour'],
+                'energy_band': context['energy_band'],
+                'action_type': action_type,
+                'action_params': [action_idx, target_idx, duration_idx, intensity_idx],
+                'duration_minutes': duration,
+                'intensity': intensity_idx + 1,
+                'target_id': target['id'] if target else None
+            }
+            rows.append((
+                self.profile_id, RECOMMENDATION_TYPE, title,
+                f"Suggested for {context['scenario'].replace('_', ' ')} at {context['hour']:02d}:00 with {context['energy_band']} energy.",
+                float(self.env.alignment_rewards.get(action_type, 0.0)), float(conf),
+                json.dumps(pattern_ids[action_type]), now, json.dumps(metadata)
+            ))
+
+        # BOLT OPTIMIZATION: Single transaction + executemany upsert for the whole grid
+        # The user's answer (status, responded_at) is kept while the suggested action is unchanged;
+        # a different action is a new suggestion and goes back to 'pending'
+        with self.db:
+            self.db.executemany("""
+                INSERT INTO recommendations
+                    (profile_id, recommendation_type, title, description, priority, confidence,
+                     based_on_pattern_ids, status, created_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 'pending', ?, ?)
+                ON CONFLICT(profile_id, recommendation_type, json_extract(metadata, '$.context_key'))
+                WHERE recommendation_type = 'rl_action'
+                DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    priority = excluded.priority,
+                    confidence = excluded.confidence,
+                    based_on_pattern_ids = excluded.based_on_pattern_ids,
+                    status = CASE WHEN {same} THEN recommendations.status ELSE 'pending' END,
+                    created_at = CASE WHEN {same} THEN recommendations.created_at ELSE excluded.created_at END,
+                    responded_at = CASE WHEN {same} THEN recommendations.responded_at ELSE NULL END,
+                    metadata = excluded.metadata
+            """.format(same=SAME_SUGGESTION), rows)
+        return len(rows)
+
+
+def get_recommendation(db, profile_id: int, hour: int, energy: float, scenario: str = 'workday') -> Optional[Dict]:
+    """
+    Indexed O(1) read of the materialized recommendation for a live context.
+    SENTINEL: Always scoped to the requesting profile.
+    """
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT id, title, description, priority, confidence, status, metadata
+        FROM recommendations
+        WHERE profile_id = ? AND recommendation_type = 'rl_action'
+          AND json_extract(metadata, '$.context_key') = ?
+    """, (profile_id, context_key(scenario, hour, energy_band(energy))))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    return {
+        'id': row[0],
+        'title': row[1],
+        'description': row[2],
+        'priority': row[3],
+        'confidence': row[4],
+        'status': row[5],
+        'metadata': json.loads(row[6])
+    }
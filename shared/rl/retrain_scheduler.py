@@ -0,0 +1,336 @@
+import math
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from shared.rl.worker_pool import spawn_pool
+
+# ============================================
+# CHANGE-DRIVEN RETRAINING SCHEDULER
+# ============================================
+
+# Tables whose rows feed DataPipeline / the reward cache; a change means the profile's twin is stale
+WATCHED_TABLES = ['responses', 'patterns', 'entity_attributes', 'workflows']
+
+SCHEDULER_SCHEMA = """
+-- Append-only change log fed by triggers; seq is the scheduler's watermark
+CREATE TABLE IF NOT EXISTS rl_change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    profile_id INTEGER NOT NULL,
+    source VARCHAR(50),
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS rl_scheduler_state (
+    key VARCHAR(50) PRIMARY KEY,
+    value INTEGER
+);
+
+-- Per-profile debounce and training watermarks
+CREATE TABLE IF NOT EXISTS rl_profile_training (
+    profile_id INTEGER PRIMARY KEY,
+    pending_changes INTEGER DEFAULT 0,
+    first_change_at REAL,
+    last_change_at REAL,
+    last_change_seq INTEGER DEFAULT 0,
+    trained_seq INTEGER DEFAULT 0,
+    last_trained_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS rl_retrain_jobs (
+    id INTEGER PRIMARY KEY,
+    profile_id INTEGER NOT NULL,
+    priority REAL, -- as of enqueued_at; ages by staleness_weight per hour while queued
+    status VARCHAR(20), -- 'queued', 'running', 'done', 'failed'
+    watermark INTEGER, -- rl_change_log seq covered by this job
+    attempts INTEGER DEFAULT 0,
+    enqueued_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    error TEXT
+);
+
+-- At most one queued/running job per profile
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rl_retrain_jobs_active
+ON rl_retrain_jobs(profile_id) WHERE status IN ('queued', 'running');
+
+CREATE INDEX IF NOT EXISTS idx_rl_retrain_jobs_queue ON rl_retrain_jobs(status, priority DESC);
+"""
+
+TRIGGER_TEMPLATE = """
+CREATE TRIGGER IF NOT EXISTS trg_rl_change_{table}_{event}
+AFTER {event_sql} ON {table}
+WHEN NEW.profile_id IS NOT NULL
+BEGIN
+    INSERT INTO rl_change_log (profile_id, source) VALUES (NEW.profile_id, '{table}');
+END;
+"""
+
+
+def install_change_tracking(db):
+    """Creates the scheduler tables and the change-log triggers on the watched tables."""
+    db.executescript(SCHEDULER_SCHEMA)
+    for table in WATCHED_TABLES:
+        for event, event_sql in (('insert', 'INSERT'), ('update', 'UPDATE')):
+            db.executescript(TRIGGER_TEMPLATE.format(table=table, event=event, event_sql=event_sql))
+    db.commit()
+
+
+def train_profile(db_path: str, profile_id: int, total_timesteps: int = 10000,
+                  model_store_dir: Optional[str] = None, adaptive: bool = False,
+                  max_timesteps: int = 100000) -> Optional[int]:
+    """
+    Default job body: retrains one profile in a worker process. Returns the stored model version, if any.
+    adaptive: Size the budget from the profile's last recorded run (total_timesteps for
+    first runs, capped at max_timesteps) and stop early once held-out reward plateaus.
+    """
+    from shared.rl.digital_twin_rl import DigitalTwinTrainer
+    from shared.rl.model_store import ModelStore
+
+    db = sqlite3.connect(db_path)
+    try:
+        trainer = DigitalTwinTrainer(db, profile_id)
+        store = ModelStore(model_store_dir) if model_store_dir else None
+        if adaptive:
+            # adaptive_budget needs stable-baselines3 at import time; plain jobs rely on train()'s check
+            from shared.rl.adaptive_budget import suggest_budget
+            budget = suggest_budget(db, profile_id, default=total_timesteps, max_timesteps=max_timesteps)
+            trainer.train(total_timesteps=budget, hyperparams={'verbose': 0}, model_store=store, early_stopping={})
+        else:
+            trainer.train(total_timesteps=total_timesteps, hyperparams={'verbose': 0}, model_store=store)
+        return trainer.model_version
+    finally:
+        db.close()
+
+
+class RetrainScheduler:
+    """
+    Local daemon that retrains only profiles whose data moved.
+
+    Triggers append (profile_id, source) rows to rl_change_log; each poll reads
+    only rows past the stored watermark. Changes are debounced per profile (a
+    quiet period, bounded by max_delay), then coalesced into one queued job
+    prioritized by staleness and activity. Jobs run under a concurrency limit
+    and live in SQLite, so queued and interrupted work survives restarts.
+    """
+
+    def __init__(self, db_path: str, max_concurrency: int = 2, debounce_seconds: float = 300.0,
+                 max_delay_seconds: float = 3600.0, staleness_weight: float = 1.0,
+                 activity_weight: float = 1.0, max_attempts: int = 3,
+                 train_fn: Callable = train_profile, train_kwargs: Optional[Dict] = None,
+                 executor=None, clock: Callable[[], float] = time.time):
+        self.db_path = db_path
+        self.max_concurrency = max_concurrency
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.staleness_weight = staleness_weight
+        self.activity_weight = activity_weight
+        self.max_attempts = max_attempts
+        self.train_fn = train_fn
+        self.train_kwargs = train_kwargs or {}
+        self.clock = clock
+
+        self.db = sqlite3.connect(db_path)
+        install_change_tracking(self.db)
+
+        # ORACLE: Jobs left 'running' by a previous process never finished; queue them again
+        with self.db:
+            self.db.execute("UPDATE rl_retrain_jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = spawn_pool(max_concurrency)
+        self.executor = executor
+        self._running = {}  # job_id -> future
+
+    def _watermark(self) -> int:
+        cursor = self.db.cursor()
+        cursor.execute("SELECT value FROM rl_scheduler_state WHERE key = 'change_log_watermark'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def detect_changes(self) -> int:
+        """Folds change-log rows past the watermark into per-profile state. Returns rows consumed."""
+        now = self.clock()
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT profile_id, COUNT(*), MAX(seq)
+            FROM rl_change_log
+            WHERE seq > ?
+            GROUP BY profile_id
+        """, (self._watermark(),))
+        changes = cursor.fetchall()
+        if not changes:
+            return 0
+
+        new_watermark = max(row[2] for row in changes)
+        with self.db:
+            self.db.executemany("""
+                INSERT INTO rl_profile_training (profile_id, pending_changes, first_change_at, last_change_at, last_change_seq)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(profile_id) DO UPDATE SET
+                    pending_changes = pending_changes + excluded.pending_changes,
+                    first_change_at = COALESCE(first_change_at, excluded.first_change_at),
+                    last_change_at = excluded.last_change_at,
+                    last_change_seq = excluded.last_change_seq
+            """, [(profile_id, count, now, now, max_seq) for profile_id, count, max_seq in changes])
+            self.db.execute("""
+                INSERT INTO rl_scheduler_state (key, value) VALUES ('change_log_watermark', ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """, (new_watermark,))
+            # BOLT: Consumed rows are folded into rl_profile_training; keep the log small
+            self.db.execute("DELETE FROM rl_change_log WHERE seq <= ?", (new_watermark,))
+        return sum(row[1] for row in changes)
+
+    def _priority(self, now: float, pending: int, first_change_at: float, last_trained_at: Optional[float]) -> float:
+        stale_since = last_trained_at if last_trained_at is not None else first_change_at
+        staleness_hours = max(0.0, now - stale_since) / 3600.0
+        # Never-trained profiles get a fixed boost over any merely stale one
+        never_trained = 24.0 if last_trained_at is None else 0.0
+        return self.staleness_weight * (staleness_hours + never_trained) + self.activity_weight * math.log1p(pending)
+
+    def enqueue_ready(self) -> int:
+        """Queues (or refreshes) jobs for profiles whose changes have settled. Returns profiles enqueued."""
+        now = self.clock()
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT t.profile_id, t.pending_changes, t.first_change_at, t.last_trained_at, t.last_change_seq, j.id, j.enqueued_at
+            FROM rl_profile_training t
+            LEFT JOIN rl_retrain_jobs j ON j.profile_id = t.profile_id AND j.status = 'queued'
+            WHERE t.pending_changes > 0
+              AND t.last_change_seq > t.trained_seq
+              AND (t.last_change_at <= ? OR t.first_change_at <= ?)
+              AND NOT EXISTS (
+                  SELECT 1 FROM rl_retrain_jobs r WHERE r.profile_id = t.profile_id AND r.status = 'running'
+              )
+        """, (now - self.debounce_seconds, now - self.max_delay_seconds))
+        ready = cursor.fetchall()
+
+        with self.db:
+            for profile_id, pending, first_change_at, last_trained_at, last_change_seq, queued_job_id, enqueued_at in ready:
+                priority = self._priority(now, pending, first_change_at, last_trained_at)
+                if queued_job_id is not None:
+                    # Coalesce into the job that is already waiting; its priority is kept as of
+                    # enqueued_at (see dispatch) and new activity can only raise it
+                    priority -= self.staleness_weight * (now - enqueued_at) / 3600.0
+                    self.db.execute("UPDATE rl_retrain_jobs SET priority = MAX(priority, ?), watermark = ? WHERE id = ?",
+                                    (priority, last_change_seq, queued_job_id))
+                else:
+                    self.db.execute("""
+                        INSERT INTO rl_retrain_jobs (profile_id, priority, status, watermark, enqueued_at)
+                        VALUES (?, ?, 'queued', ?, ?)
+                    """, (profile_id, priority, last_change_seq, now))
+                self.db.execute("""
+                    UPDATE rl_profile_training SET pending_changes = 0, first_change_at = NULL WHERE profile_id = ?
+                """, (profile_id,))
+        return len(ready)
+
+    def _harvest(self) -> List[int]:
+        """Records finished jobs; failed jobs are retried up to max_attempts."""
+        finished = []
+        now = self.clock()
+        for job_id, future in list(self._running.items()):
+            if not future.done():
+                continue
+            del self._running[job_id]
+            finished.append(job_id)
+
+            error = future.exception()
+            with self.db:
+                if error is None:
+                    self.db.execute("UPDATE rl_retrain_jobs SET status = 'done', finished_at = ? WHERE id = ?", (now, job_id))
+                    self.db.execute("""
+                        UPDATE rl_profile_training
+                        SET trained_seq = MAX(trained_seq, (SELECT watermark FROM rl_retrain_jobs WHERE id = ?)),
+                            last_trained_at = ?
+                        WHERE profile_id = (SELECT profile_id FROM rl_retrain_jobs WHERE id = ?)
+                    """, (job_id, now, job_id))
+                else:
+                    self.db.execute("""
+                        UPDATE rl_retrain_jobs
+                        SET status = CASE WHEN attempts < ? THEN 'queued' ELSE 'failed' END,
+                            started_at = NULL, finished_at = ?, error = ?
+                        WHERE id = ?
+                    """, (self.max_attempts, now, str(error), job_id))
+        return finished
+
+    def dispatch(self) -> List[int]:
+        """Starts the highest-priority queued jobs up to the concurrency limit. Returns started job ids."""
+        started = []
+        slots = self.max_concurrency - len(self._running)
+        if slots <= 0:
+            return started
+
+        # Staleness keeps growing while a job waits, so older jobs cannot be starved by newer ones
+        cursor = self.db.cursor()
+        cursor.execute("""
+            SELECT id, profile_id FROM rl_retrain_jobs
+            WHERE status = 'queued'
+            ORDER BY priority + ? * (? - enqueued_at) / 3600.0 DESC, id
+            LIMIT ?
+        """, (self.staleness_weight, self.clock(), slots))
+        for job_id, profile_id in cursor.fetchall():
+            with self.db:
+                self.db.execute("""
+                    UPDATE rl_retrain_jobs SET status = 'running', started_at = ?, attempts = attempts + 1 WHERE id = ?
+                """, (self.clock(), job_id))
+            self._running[job_id] = self.executor.submit(self.train_fn, self.db_path, profile_id, **self.train_kwargs)
+            started.append(job_id)
+        return started
+
+    def run_once(self) -> Dict[str, int]:
+        """One scheduler tick: harvest, detect, debounce/enqueue, dispatch."""
+        finished = self._harvest()
+        changes = self.detect_changes()
+        enqueued = self.enqueue_ready()
+        started = self.dispatch()
+        return {'finished': len(finished), 'changes': changes, 'enqueued': enqueued, 'started': len(started)}
+
+    def wait(self):
+        """Blocks until all running jobs finish and records their outcome."""
+        for future in list(self._running.values()):
+            try:
+                future.result()
+            except Exception:
+                pass
+        self._harvest()
+
+    def run_forever(self, poll_interval: float = 5.0, stop_event: Optional[threading.Event] = None):
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            self.run_once()
+            stop_event.wait(poll_interval)
+        self.wait()
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+        self.db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Change-driven Digital Twin retraining daemon")
+    parser.add_argument('db_path')
+    parser.add_argument('--concurrency', type=int, default=2)
+    parser.add_argument('--debounce', type=float, default=300.0)
+    parser.add_argument('--poll-interval', type=float, default=5.0)
+    parser.add_argument('--timesteps', type=int, default=10000)
+    parser.add_argument('--model-store', default=None)
+    parser.add_argument('--adaptive', action='store_true', help="Convergence-aware per-profile budgets")
+    parser.add_argument('--max-timesteps', type=int, default=100000)
+    args = parser.parse_args()
+
+    scheduler = RetrainScheduler(
+        args.db_path, max_concurrency=args.concurrency, debounce_seconds=args.debounce,
+        train_kwargs={'total_timesteps': args.timesteps, 'model_store_dir': args.model_store,
+                      'adaptive': args.adaptive, 'max_timesteps': args.max_timesteps}
+    )
+    try:
+        scheduler.run_forever(poll_interval=args.poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.close()
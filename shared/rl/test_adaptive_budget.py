@@ -0,0 +1,57 @@
+import math
+import sqlite3
+import os
+import sys
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.digital_twin_rl import DigitalTwinTrainer
+from shared.rl.adaptive_budget import suggest_budget
+
+def setup_db():
+    db = sqlite3.connect(':memory:')
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        db.executescript(f.read())
+    db.execute("INSERT INTO profile (id) VALUES (1)")
+    db.execute("INSERT INTO profile (id) VALUES (2)")
+    db.commit()
+    return db
+
+def train(db, profile_id, total_timesteps, **early_stopping):
+    trainer = DigitalTwinTrainer(db, profile_id)
+    model = trainer.train(total_timesteps=total_timesteps, model_store=_NullStore(),
+                          hyperparams={'n_steps': 64, 'batch_size': 32, 'n_epochs': 1, 'verbose': 0, 'seed': 0},
+                          early_stopping=dict(eval_freq=64, n_eval_episodes=2, **early_stopping))
+    return trainer, model
+
+class _NullStore:
+    def save(self, profile_id, model, cohort=None):
+        return None
+
+def test_plateau_stops_early_and_records_budget():
+    db = setup_db()
+    # Any tolerance this large means no evaluation ever counts as an improvement after the first
+    trainer, model = train(db, 1, 4096, tolerance=1e9, patience=2, min_timesteps=192)
+
+    assert trainer.convergence.converged
+    assert model.num_timesteps < 4096
+    assert len(trainer.convergence.history) == 3
+
+    row = db.execute("SELECT max_timesteps, timesteps_used, converged, n_evaluations FROM rl_training_budgets WHERE profile_id = 1").fetchone()
+    assert row == (4096, model.num_timesteps, 1, 3)
+    # Converged runs get what they needed plus headroom
+    assert suggest_budget(db, 1, default=10000, min_timesteps=0) == math.ceil(model.num_timesteps * 1.5)
+
+def test_unconverged_run_grows_next_budget():
+    db = setup_db()
+    assert suggest_budget(db, 2, default=10000) == 10000
+
+    # A negative tolerance can never be met: the whole budget is used
+    trainer, model = train(db, 2, 256, tolerance=-1e9, patience=1)
+    assert not trainer.convergence.converged
+    assert model.num_timesteps == 256
+
+    assert suggest_budget(db, 2, default=10000, min_timesteps=0) == 512
+    assert suggest_budget(db, 2, default=10000, min_timesteps=0, max_timesteps=300) == 300
@@ -0,0 +1,70 @@
+import os
+import sys
+import numpy as np
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.digital_twin_rl import PersonalLifeEnv
+
+def make_env():
+    user_data = {
+        'profile_id': 1,
+        'projects': [{'id': i, 'name': f'P{i}', 'progress': 0.1, 'priority': 0.6, 'deadline_days': 3 + i} for i in range(4)],
+        'relationships': [{'id': i, 'name': f'R{i}', 'strength': 0.5, 'priority': 0.7, 'days_since_contact': 5} for i in range(3)]
+    }
+    return PersonalLifeEnv(user_data, {})
+
+def rollout(env, actions):
+    trace = []
+    for action in actions:
+        obs, reward, terminated, truncated, info = env.step(action)
+        trace.append((reward, terminated, info, {k: v.tolist() for k, v in obs.items()}))
+        if terminated:
+            break
+    return trace
+
+def test_restore_replays_identically():
+    env = make_env()
+    env.reset(seed=11, options={'scenario_type': 'deadline_crisis'})
+    env.step(np.array([1, 0, 3, 4]))
+    snap = env.snapshot()
+    state_before = {k: v for k, v in env.state.items() if k not in ('projects', 'relationships')}
+
+    rng = np.random.default_rng(0)
+    actions = [np.array([rng.integers(7), rng.integers(20), rng.integers(12), rng.integers(5)]) for _ in range(40)]
+    first = rollout(env, actions)
+
+    # Restoring replays the same branch, including random events, any number of times
+    for _ in range(2):
+        obs = env.restore(snap)
+        assert {k: v for k, v in env.state.items() if k not in ('projects', 'relationships')} == state_before
+        assert obs['temporal'][0] == state_before['hour'] / 24
+        assert rollout(env, actions) == first
+
+def test_snapshot_is_isolated_from_later_mutation():
+    env = make_env()
+    env.reset(seed=3, options={'scenario_type': 'workday'})
+    snap = env.snapshot()
+    progress = env.cached_project_progress
+    # Entity lists live only in their own fields, never aliased through state
+    assert 'projects' not in snap.state and 'relationships' not in snap.state
+
+    for _ in range(3):
+        env.step(np.array([1, 0, 11, 4]))  # work_on_project
+    env.step(np.array([3, 0, 0, 0]))       # call_person
+    assert env.cached_project_progress > progress
+
+    env.restore(snap)
+    assert env.cached_project_progress == progress
+    assert env.state['projects'][0]['progress'] == 0.1
+    assert env.state['relationships'][0]['strength'] == 0.5
+    assert snap.projects[0]['progress'] == 0.1
+
+    # Mutating the restored env must not leak back into the snapshot
+    env.step(np.array([1, 0, 11, 4]))
+    assert snap.projects[0]['progress'] == 0.1
+
+if __name__ == "__main__":
+    test_restore_replays_identically()
+    test_snapshot_is_isolated_from_later_mutation()
@@ -0,0 +1,96 @@
+import sqlite3
+import json
+import os
+import sys
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.digital_twin_rl import PersonalLifeEnv, DataPipeline
+from shared.rl.evaluation import SCENARIOS, evaluate_policy, evaluate_saved_models, release_gate
+
+def setup_db(path):
+    db = sqlite3.connect(path)
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        db.executescript(f.read())
+
+    cursor = db.cursor()
+    for profile_id in (1, 2):
+        cursor.execute("INSERT INTO profile (id) VALUES (?)", (profile_id,))
+        cursor.execute("INSERT INTO entities (profile_id, name, entity_type) VALUES (?, 'Friend', 'person')", (profile_id,))
+        cursor.execute("INSERT INTO workflows (profile_id, name, workflow_type, status, metadata) VALUES (?, 'Project', 'project', 'active', ?)",
+                       (profile_id, json.dumps({'progress': 0.2, 'priority': 0.8, 'deadline_days': 3})))
+    db.commit()
+    return db
+
+def train_tiny_model(user_data, db):
+    from stable_baselines3 import PPO
+    env = PersonalLifeEnv(user_data, {}, db_connection=db)
+    model = PPO("MultiInputPolicy", env, n_steps=64, batch_size=32, verbose=0, seed=0)
+    model.learn(total_timesteps=64)
+    return model
+
+def test_seeded_episodes_are_reproducible():
+    user_data = {'profile_id': 1, 'projects': [{'id': 1, 'progress': 0.0, 'priority': 0.5, 'deadline_days': 5}],
+                 'relationships': [{'id': 1, 'strength': 0.5, 'priority': 0.5, 'days_since_contact': 3}]}
+    env_a, env_b = PersonalLifeEnv(user_data, {}), PersonalLifeEnv(user_data, {})
+    obs_a, info_a = env_a.reset(seed=42)
+    obs_b, info_b = env_b.reset(seed=42)
+    assert info_a == info_b
+    for _ in range(10):
+        action = env_a.action_space.sample()
+        _, reward_a, *_ = env_a.step(action)
+        _, reward_b, *_ = env_b.step(action)
+        assert reward_a == reward_b
+
+def test_batched_evaluation(tmp_path):
+    db = setup_db(str(tmp_path / 'eval.db'))
+    user_data = DataPipeline(db).prepare_user_data(1)
+    model = train_tiny_model(user_data, db)
+
+    report = evaluate_policy(model, user_data, n_episodes=12, n_envs=8, seed=100, db_connection=db)
+    assert set(report) == set(SCENARIOS) | {'overall'}
+    assert report['overall']['n_episodes'] == 12 * len(SCENARIOS)
+    for stats in report.values():
+        assert 0.0 <= stats['burnout_rate'] <= 1.0
+        assert stats['p5_reward'] <= stats['median_reward'] <= stats['p95_reward']
+
+    # Batch size must not change results: episodes are seeded independently of env slots
+    serial = evaluate_policy(model, user_data, n_episodes=12, n_envs=1, seed=100, db_connection=db)
+    assert serial == report
+
+def test_evaluate_saved_models_in_parallel(tmp_path):
+    db_path = str(tmp_path / 'eval.db')
+    db = setup_db(db_path)
+    model_paths = {}
+    for profile_id in (1, 2):
+        model = train_tiny_model(DataPipeline(db).prepare_user_data(profile_id), db)
+        model_paths[profile_id] = str(tmp_path / f"digital_twin_{profile_id}.zip")
+        model.save(model_paths[profile_id])
+    model_paths[3] = str(tmp_path / "missing.zip")
+
+    reports = evaluate_saved_models(db_path, model_paths, scenarios=['workday'], n_episodes=5, n_envs=5, max_workers=2)
+    assert reports[1]['workday']['n_episodes'] == 5
+    assert reports[2]['overall']['n_episodes'] == 5
+    assert 'error' in reports[3]
+    assert release_gate(reports[3])[0] is False
+
+def test_release_gate():
+    def stats(mean, burnout):
+        return {'mean_reward': mean, 'burnout_rate': burnout}
+
+    baseline = {'workday': stats(-2.0, 0.0), 'social_focus': stats(1.0, 0.0)}
+    passed, reasons = release_gate({'workday': stats(-2.05, 0.01), 'social_focus': stats(1.2, 0.0), 'overall': stats(0.0, 0.0)}, baseline)
+    assert passed and not reasons
+
+    passed, reasons = release_gate({'workday': stats(-3.0, 0.2), 'social_focus': stats(1.0, 0.0)}, baseline)
+    assert not passed
+    assert len(reasons) == 2
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_seeded_episodes_are_reproducible()
+    test_batched_evaluation(pathlib.Path(tempfile.mkdtemp()))
+    test_evaluate_saved_models_in_parallel(pathlib.Path(tempfile.mkdtemp()))
+    test_release_gate()
@@ -0,0 +1,97 @@
+import sqlite3
+import json
+import os
+import sys
+import pytest
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.hyperparameter_sweep import (
+    HyperparameterSweep, attach_to_cohort, load_cohort_config, rollout_size, rung_budgets, sample_configs, trial_budget
+)
+from shared.rl.digital_twin_rl import DigitalTwinTrainer
+
+def setup_db(path):
+    db = sqlite3.connect(path)
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        db.executescript(f.read())
+
+    cursor = db.cursor()
+    for profile_id in (1, 2):
+        cursor.execute("INSERT INTO profile (id) VALUES (?)", (profile_id,))
+        cursor.execute("INSERT INTO entities (profile_id, name, entity_type) VALUES (?, 'Friend', 'person')", (profile_id,))
+        cursor.execute("INSERT INTO workflows (profile_id, name, workflow_type, status, metadata) VALUES (?, 'Project', 'project', 'active', ?)",
+                       (profile_id, json.dumps({'progress': 0.1, 'priority': 0.7, 'deadline_days': 4})))
+    db.commit()
+    return db
+
+def test_budgets_and_sampling():
+    assert rung_budgets(64, 576, 3) == [64, 192, 576]
+    assert rung_budgets(64, 100, 3) == [64, 100]
+    # Budgets round down to each config's own whole rollouts
+    assert trial_budget(480, {'n_steps': 48, 'n_envs': 3}) == 432
+    assert trial_budget(480, {'n_steps': 80}) == 480
+    assert trial_budget(480, {}) == 0  # PPO's default n_steps=2048
+
+    space = {'learning_rate': (1e-4, 1e-2), 'n_steps': [64, 128], 'gamma': 0.99}
+    configs = sample_configs(space, 5, seed=1)
+    assert configs == sample_configs(space, 5, seed=1)
+    for config in configs:
+        assert 1e-4 <= config['learning_rate'] <= 1e-2
+        assert config['n_steps'] in (64, 128)
+        assert config['gamma'] == 0.99
+
+def test_successive_halving_sweep(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / 'sweep.db')
+    db = setup_db(db_path)
+
+    sweep = HyperparameterSweep(
+        db_path, [1, 2],
+        search_space={'learning_rate': [3e-4, 1e-3], 'n_steps': [48], 'batch_size': [16], 'n_envs': [1, 3]},
+        n_trials=3, min_timesteps=160, max_timesteps=480, eta=3, max_workers=2, n_eval_episodes=2
+    )
+    best = sweep.run(name='test')
+    sweep.close()
+
+    cursor = db.cursor()
+    cursor.execute("SELECT rung, COUNT(*) FROM rl_sweep_trials WHERE sweep_id = ? GROUP BY rung", (best['sweep_id'],))
+    assert dict(cursor.fetchall()) == {0: 3, 1: 1}
+    cursor.execute("SELECT COUNT(*) FROM rl_sweep_trials WHERE sweep_id = ? AND status = 'pruned'", (best['sweep_id'],))
+    assert cursor.fetchone()[0] == 2
+    # Rollouts of 48 or 144 steps: each trial trains whole rollouts, never past its rung budget
+    cursor.execute("SELECT budget, timesteps, config FROM rl_sweep_trials WHERE sweep_id = ?", (best['sweep_id'],))
+    for budget, timesteps, config in cursor.fetchall():
+        size = rollout_size(json.loads(config))
+        assert budget in (160, 480)
+        assert timesteps % size == 0 and budget - size < timesteps <= budget
+    assert best['timesteps'] <= 480
+
+    # The winning config is attachable to a cohort and usable by the trainer
+    attach_to_cohort(db, 'default', best['sweep_id'])
+    config = load_cohort_config(db, 'default')
+    assert config == best['config']
+    assert load_cohort_config(db, 'missing') is None
+
+    trainer = DigitalTwinTrainer(db, 1)
+    model = trainer.train(total_timesteps=64, hyperparams=dict(config, verbose=0))
+    assert model.n_envs == config['n_envs']
+    assert (tmp_path / "digital_twin_1.zip").exists()
+
+def test_rollouts_larger_than_min_budget_are_rejected(tmp_path):
+    db_path = str(tmp_path / 'sweep.db')
+    setup_db(db_path)
+    sweep = HyperparameterSweep(db_path, [1], search_space={'n_steps': [1000], 'n_envs': [3]},
+                                n_trials=2, min_timesteps=2048, max_timesteps=18432)
+    with pytest.raises(ValueError):
+        sweep.run()
+    sweep.close()
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_budgets_and_sampling()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_successive_halving_sweep(pathlib.Path(tempfile.mkdtemp()), monkeypatch)
+    test_rollouts_larger_than_min_budget_are_rejected(pathlib.Path(tempfile.mkdtemp()))
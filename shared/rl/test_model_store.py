@@ -0,0 +1,106 @@
+import sqlite3
+import json
+import os
+import sys
+import pytest
+import numpy as np
+import torch
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.digital_twin_rl import DigitalTwinTrainer
+from shared.rl.model_store import ModelStore, read_tensor_file, VALUE_PREFIXES
+
+def setup_db():
+    db = sqlite3.connect(':memory:')
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        db.executescript(f.read())
+
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO profile (id) VALUES (1)")
+    cursor.execute("INSERT INTO entities (profile_id, name, entity_type) VALUES (1, 'Friend', 'person')")
+    cursor.execute("INSERT INTO workflows (profile_id, name, workflow_type, status, metadata) VALUES (1, 'Project', 'project', 'active', ?)",
+                   (json.dumps({'progress': 0.1, 'priority': 0.6, 'deadline_days': 4}),))
+    db.commit()
+    return db
+
+TINY_PPO = {'n_steps': 64, 'batch_size': 32, 'verbose': 0}
+
+def test_float16_roundtrip_and_inference_subset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = setup_db()
+    store = ModelStore(str(tmp_path / 'store'))
+    trainer = DigitalTwinTrainer(db, 1)
+    model = trainer.train(total_timesteps=64, hyperparams=TINY_PPO, model_store=store)
+    assert trainer.model_version == 1
+    assert not (tmp_path / "digital_twin_1.zip").exists()
+
+    original = {k: v.numpy() for k, v in model.policy.state_dict().items()}
+    tensors = store.load_tensors(1)
+    assert tensors
+    assert not any(name.startswith(VALUE_PREFIXES) for name in tensors)
+    for name, array in tensors.items():
+        np.testing.assert_allclose(array, original[name], atol=1e-2, rtol=1e-2)
+
+    full = store.load_tensors(1, inference_only=False)
+    assert set(full) == set(original)
+
+    # Weights are float16 on disk and loaded through memory-mapped views
+    cursor = store.db.cursor()
+    cursor.execute("SELECT path FROM model_versions WHERE profile_id = 1 AND version = 1")
+    raw = read_tensor_file(os.path.join(store.root_dir, cursor.fetchone()[0]))
+    assert all(array.dtype == np.float16 for array in raw.values())
+    assert all(isinstance(array, np.memmap) or isinstance(array.base, np.memmap) for array in raw.values())
+
+    # A model rebuilt from the store predicts like the original
+    restored = store.load_model(1, trainer.env)
+    obs, _ = trainer.env.reset(seed=3)
+    obs_tensor, _ = model.policy.obs_to_tensor(obs)
+    with torch.no_grad():
+        expected = model.policy.get_distribution(obs_tensor).distribution[0].probs
+        actual = restored.policy.get_distribution(obs_tensor).distribution[0].probs
+    np.testing.assert_allclose(actual.numpy(), expected.numpy(), atol=1e-2)
+
+def test_cohort_deltas_and_garbage_collection(tmp_path):
+    db = setup_db()
+    store = ModelStore(str(tmp_path / 'store'))
+    trainer = DigitalTwinTrainer(db, 1)
+    base_model = trainer.train(total_timesteps=64, hyperparams=TINY_PPO, model_store=store)
+    base_id = store.save_base('cohort-a', base_model)
+
+    # Unchanged tensors are not stored at all in a delta version
+    version = store.save(1, base_model, cohort='cohort-a')
+    cursor = store.db.cursor()
+    cursor.execute("SELECT path, base_id FROM model_versions WHERE profile_id = 1 AND version = ?", (version,))
+    path, stored_base = cursor.fetchone()
+    assert stored_base == base_id
+    assert read_tensor_file(os.path.join(store.root_dir, path)) == {}
+
+    # A fine-tuned profile policy reconstructs as base + delta
+    base_model.learn(total_timesteps=64)
+    tuned = {k: v.numpy().copy() for k, v in base_model.policy.state_dict().items()}
+    version = store.save(1, base_model, cohort='cohort-a')
+    for name, array in store.load_tensors(1, inference_only=False).items():
+        np.testing.assert_allclose(array, tuned[name], atol=1e-2, rtol=1e-2)
+
+    # GC keeps only the newest version; the base stays while referenced
+    assert store.latest_version(1) == 3
+    assert store.collect_garbage(keep=1) == 2
+    cursor.execute("SELECT version FROM model_versions WHERE profile_id = 1")
+    assert cursor.fetchall() == [(3,)]
+    assert store.load_tensors(1, version=3)
+
+    # A superseded, unreferenced base is collected
+    store.save_base('cohort-a', base_model)
+    store.save(1, base_model, cohort='cohort-a')
+    assert store.collect_garbage(keep=1) == 2
+    cursor.execute("SELECT COUNT(*) FROM model_bases")
+    assert cursor.fetchone()[0] == 1
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_float16_roundtrip_and_inference_subset(pathlib.Path(tempfile.mkdtemp()), monkeypatch)
+    test_cohort_deltas_and_garbage_collection(pathlib.Path(tempfile.mkdtemp()))
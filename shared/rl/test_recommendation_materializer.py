@@ -0,0 +1,84 @@
+import sqlite3
+import json
+import os
+import sys
+import pytest
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.digital_twin_rl import DigitalTwinTrainer
+from shared.rl.recommendation_materializer import DEFAULT_HOURS, ENERGY_BANDS, get_recommendation
+from shared.rl.evaluation import SCENARIOS
+
+def setup_db():
+    db = sqlite3.connect(':memory:')
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        db.executescript(f.read())
+
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO profile (id) VALUES (1)")
+    cursor.execute("INSERT INTO profile (id) VALUES (2)")
+    cursor.execute("INSERT INTO dimensions (id, name) VALUES (1, 'Health')")
+    cursor.execute("INSERT INTO aspects (id, dimension_id, name, code) VALUES (1, 1, 'Sleep', 'HEA_SLEEP')")
+    cursor.execute("INSERT INTO patterns (profile_id, dimension_id, aspect_id, strength, confidence) VALUES (1, 1, 1, 0.9, 0.9)")
+    cursor.execute("INSERT INTO entities (id, profile_id, name, entity_type) VALUES (1, 1, 'Sarah', 'person')")
+    cursor.execute("INSERT INTO workflows (id, profile_id, name, workflow_type, status, metadata) VALUES (1, 1, 'Q4 Report', 'project', 'active', ?)",
+                   (json.dumps({'progress': 0.4, 'priority': 0.9, 'deadline_days': 5}),))
+    db.commit()
+    return db
+
+def test_materialize_and_lookup(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db = setup_db()
+    trainer = DigitalTwinTrainer(db, 1)
+    model = trainer.train(total_timesteps=64, hyperparams={'n_steps': 64, 'batch_size': 32, 'verbose': 0})
+    assert (tmp_path / "digital_twin_1.zip").exists()
+
+    # Training already refreshed the grid
+    expected = len(DEFAULT_HOURS) * len(ENERGY_BANDS) * len(SCENARIOS)
+    cursor = db.cursor()
+    cursor.execute("SELECT COUNT(*) FROM recommendations WHERE profile_id = 1 AND recommendation_type = 'rl_action'")
+    assert cursor.fetchone()[0] == expected
+    assert trainer.materialize_recommendations(model) == expected
+
+    # Re-materializing upserts in place and keeps answers to unchanged suggestions
+    cursor.execute("UPDATE recommendations SET status = 'accepted', responded_at = '2026-01-01 09:00:00' WHERE profile_id = 1")
+    # Pretend one context previously suggested a different action
+    cursor.execute("""
+        UPDATE recommendations SET metadata = json_set(metadata, '$.action_params', json('[99, 0, 0, 0]'))
+        WHERE profile_id = 1 AND json_extract(metadata, '$.context_key') = 'workday:09:low'
+    """)
+    db.commit()
+    assert trainer.materialize_recommendations(model) == expected
+    cursor.execute("""
+        SELECT COUNT(*), SUM(status = 'accepted' AND responded_at IS NOT NULL), SUM(status = 'pending' AND responded_at IS NULL)
+        FROM recommendations WHERE profile_id = 1 AND recommendation_type = 'rl_action'
+    """)
+    assert cursor.fetchone() == (expected, expected - 1, 1)
+    cursor.execute("SELECT status FROM recommendations WHERE profile_id = 1 AND json_extract(metadata, '$.context_key') = 'workday:09:low'")
+    assert cursor.fetchone()[0] == 'pending'
+
+    rec = get_recommendation(db, 1, hour=9, energy=0.15, scenario='deadline_crisis')
+    assert rec is not None
+    assert rec['metadata']['energy_band'] == 'low'
+    assert rec['metadata']['hour'] == 9
+    assert 0.0 < rec['confidence'] <= 1.0
+    if rec['metadata']['action_type'] == 'rest':
+        assert rec['priority'] == 0.9 * 0.9
+
+    # SENTINEL: Other profiles never see this profile's recommendations
+    assert get_recommendation(db, 2, hour=9, energy=0.15, scenario='deadline_crisis') is None
+
+    cursor.execute("""
+        EXPLAIN QUERY PLAN
+        SELECT id FROM recommendations
+        WHERE profile_id = 1 AND recommendation_type = 'rl_action' AND json_extract(metadata, '$.context_key') = 'workday:09:low'
+    """)
+    assert 'idx_recommendations_rl_context' in ' '.join(str(row) for row in cursor.fetchall())
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_materialize_and_lookup(pathlib.Path(tempfile.mkdtemp()), monkeypatch)
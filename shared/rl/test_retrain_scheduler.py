@@ -0,0 +1,174 @@
+import sqlite3
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.retrain_scheduler import RetrainScheduler
+
+def setup_db(path):
+    db = sqlite3.connect(path)
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        db.executescript(f.read())
+    for profile_id in (1, 2, 3):
+        db.execute("INSERT INTO profile (id) VALUES (?)", (profile_id,))
+    db.commit()
+    return db
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+    def __call__(self):
+        return self.now
+
+def make_scheduler(db_path, clock, trained, fail_profiles=()):
+    def fake_train(db_path, profile_id):
+        if profile_id in fail_profiles:
+            raise RuntimeError("training diverged")
+        trained.append(profile_id)
+
+    return RetrainScheduler(db_path, max_concurrency=1, debounce_seconds=60, max_delay_seconds=600,
+                            max_attempts=2, train_fn=fake_train, executor=ThreadPoolExecutor(1), clock=clock)
+
+def test_debounced_prioritized_retraining(tmp_path):
+    db_path = str(tmp_path / 'twin.db')
+    db = setup_db(db_path)
+    clock, trained = FakeClock(), []
+    scheduler = make_scheduler(db_path, clock, trained)
+
+    # A burst of changes for profile 1, a single change for profile 2, nothing for 3
+    for i in range(5):
+        db.execute("INSERT INTO entities (profile_id, entity_type, name) VALUES (1, 'person', ?)", (f"P{i}",))
+        db.execute("INSERT INTO entity_attributes (profile_id, entity_id, attribute_type, value) VALUES (1, ?, 'trust', 0.5)", (i + 1,))
+    db.execute("INSERT INTO workflows (profile_id, name, workflow_type, status) VALUES (2, 'Project', 'project', 'active')")
+    db.commit()
+
+    tick = scheduler.run_once()
+    assert tick['changes'] == 6
+    assert tick['enqueued'] == 0  # still inside the debounce window
+
+    # More activity extends the quiet period for profile 1 only
+    clock.now += 30
+    db.execute("UPDATE entity_attributes SET value = 0.9 WHERE profile_id = 1 AND entity_id = 1")
+    db.commit()
+    scheduler.run_once()
+
+    clock.now += 45  # profile 2 has been quiet for 75s, profile 1 for 45s
+    tick = scheduler.run_once()
+    assert tick['enqueued'] == 1
+    scheduler.wait()
+    assert trained == [2]
+
+    clock.now += 30
+    scheduler.run_once()
+    scheduler.wait()
+    assert trained == [2, 1]
+
+    # Watermarks mean nothing is retrained again until new rows arrive
+    clock.now += 1000
+    tick = scheduler.run_once()
+    assert tick['changes'] == 0 and tick['enqueued'] == 0
+    cursor = db.cursor()
+    cursor.execute("SELECT COUNT(*) FROM rl_change_log")
+    assert cursor.fetchone()[0] == 0
+    cursor.execute("SELECT profile_id FROM rl_profile_training WHERE last_trained_at IS NOT NULL ORDER BY profile_id")
+    assert cursor.fetchall() == [(1,), (2,)]
+    scheduler.close()
+
+def test_priority_order_and_restart_recovery(tmp_path):
+    db_path = str(tmp_path / 'twin.db')
+    db = setup_db(db_path)
+    clock, trained = FakeClock(), []
+    scheduler = make_scheduler(db_path, clock, trained)
+
+    db.execute("INSERT INTO workflows (profile_id, name, workflow_type, status) VALUES (2, 'Project', 'project', 'active')")
+    for i in range(20):
+        db.execute("INSERT INTO responses (profile_id, question_id) VALUES (3, ?)", (i,))
+    db.commit()
+    scheduler.detect_changes()
+    clock.now += 120
+    assert scheduler.enqueue_ready() == 2
+
+    cursor = db.cursor()
+    cursor.execute("SELECT profile_id FROM rl_retrain_jobs WHERE status = 'queued' ORDER BY priority DESC")
+    assert cursor.fetchall() == [(3,), (2,)]  # more activity first
+
+    # Simulate a crash while a job was running: the new daemon queues it again
+    db.execute("UPDATE rl_retrain_jobs SET status = 'running' WHERE profile_id = 3")
+    db.commit()
+    scheduler.close()
+
+    restarted = make_scheduler(db_path, clock, trained)
+    cursor.execute("SELECT COUNT(*) FROM rl_retrain_jobs WHERE status = 'queued'")
+    assert cursor.fetchone()[0] == 2
+    restarted.run_once()
+    restarted.wait()
+    restarted.run_once()
+    restarted.wait()
+    assert trained == [3, 2]
+    restarted.close()
+
+def test_waiting_jobs_keep_aging(tmp_path):
+    db_path = str(tmp_path / 'twin.db')
+    db = setup_db(db_path)
+    clock, trained = FakeClock(), []
+    scheduler = make_scheduler(db_path, clock, trained)
+    hour = 3600.0
+
+    # Profile 2: stale since an hour ago, one change, queued now
+    db.execute("INSERT INTO workflows (profile_id, name, workflow_type, status) VALUES (2, 'Project', 'project', 'active')")
+    db.commit()
+    scheduler.detect_changes()
+    db.execute("UPDATE rl_profile_training SET last_trained_at = ? WHERE profile_id = 2", (clock.now - hour,))
+    db.commit()
+    clock.now += 120
+    assert scheduler.enqueue_ready() == 1
+
+    # Profile 3: busier, but trained 5h later and queued 10h later with a higher snapshot priority
+    for i in range(20):
+        db.execute("INSERT INTO responses (profile_id, question_id) VALUES (3, ?)", (i,))
+    db.commit()
+    clock.now += 10 * hour
+    scheduler.detect_changes()
+    db.execute("UPDATE rl_profile_training SET last_trained_at = ? WHERE profile_id = 3", (clock.now - 5 * hour,))
+    db.commit()
+    clock.now += 120
+    assert scheduler.enqueue_ready() == 1
+    cursor = db.cursor()
+    cursor.execute("SELECT profile_id FROM rl_retrain_jobs ORDER BY priority DESC")
+    assert cursor.fetchall() == [(3,), (2,)]
+
+    # Profile 2 has waited and been stale longer, so it runs first
+    scheduler.dispatch()
+    scheduler.wait()
+    assert trained == [2]
+    scheduler.close()
+
+def test_failed_jobs_are_retried_then_marked_failed(tmp_path):
+    db_path = str(tmp_path / 'twin.db')
+    db = setup_db(db_path)
+    clock, trained = FakeClock(), []
+    scheduler = make_scheduler(db_path, clock, trained, fail_profiles=(1,))
+
+    db.execute("INSERT INTO patterns (profile_id, pattern_type, strength, confidence) VALUES (1, 'behavioral', 0.5, 0.5)")
+    db.commit()
+    scheduler.detect_changes()
+    clock.now += 120
+    for _ in range(3):
+        scheduler.run_once()
+        scheduler.wait()
+
+    cursor = db.cursor()
+    cursor.execute("SELECT status, attempts, error FROM rl_retrain_jobs WHERE profile_id = 1")
+    assert cursor.fetchone() == ('failed', 2, 'training diverged')
+    scheduler.close()
+
+if __name__ == "__main__":
+    import tempfile, pathlib
+    test_debounced_prioritized_retraining(pathlib.Path(tempfile.mkdtemp()))
+    test_priority_order_and_restart_recovery(pathlib.Path(tempfile.mkdtemp()))
+    test_waiting_jobs_keep_aging(pathlib.Path(tempfile.mkdtemp()))
+    test_failed_jobs_are_retried_then_marked_failed(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,70 @@
+import sqlite3
+import os
+import sys
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.digital_twin_rl import PersonalLifeEnv, DataPipeline
+from shared.rl.synthetic_profiles import SyntheticProfileGenerator, SCHEMA_PATH
+
+def setup_db():
+    db = sqlite3.connect(':memory:')
+    with open(SCHEMA_PATH, 'r') as f:
+        db.executescript(f.read())
+    return db
+
+def table_counts(db):
+    cursor = db.cursor()
+    counts = {}
+    for table in ('profile', 'entities', 'entity_attributes', 'workflows', 'patterns'):
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        counts[table] = cursor.fetchone()[0]
+    return counts
+
+def test_generates_seeded_realistic_profiles():
+    db = setup_db()
+    counts = SyntheticProfileGenerator(db, seed=7).generate(500, chunk_size=128)
+    assert counts == table_counts(db)
+    assert counts['profile'] == 500
+    assert counts['entity_attributes'] > counts['profile']
+    assert counts['patterns'] > 0
+
+    # Same seed, same data
+    other = setup_db()
+    assert SyntheticProfileGenerator(other, seed=7).generate(500, chunk_size=128) == counts
+    assert db.execute("SELECT metadata FROM workflows WHERE id = 42").fetchone() == other.execute("SELECT metadata FROM workflows WHERE id = 42").fetchone()
+
+    # Patterns only reference the aspects the env maps actions to
+    cursor = db.cursor()
+    cursor.execute("SELECT DISTINCT a.code FROM patterns p JOIN aspects a ON p.aspect_id = a.id")
+    assert {row[0] for row in cursor.fetchall()} <= set(PersonalLifeEnv.ACTION_MAPPING.values())
+
+    # Generated profiles flow through the pipeline and env like real ones
+    pipeline = DataPipeline(db)
+    cursor.execute("SELECT profile_id FROM entities WHERE entity_type = 'person' GROUP BY profile_id ORDER BY COUNT(*) DESC LIMIT 1")
+    profile_id = cursor.fetchone()[0]
+    user_data = pipeline.prepare_user_data(profile_id)
+    assert 0 < len(user_data['relationships']) <= 20
+    assert all(0.0 <= r['strength'] <= 1.0 for r in user_data['relationships'])
+    cursor.execute("SELECT COUNT(*) FROM workflows WHERE profile_id = ? AND workflow_type = 'project' AND status = 'active'", (profile_id,))
+    assert len(user_data['projects']) == cursor.fetchone()[0]
+
+    env = PersonalLifeEnv(user_data, user_data['preferences'], db_connection=db)
+    env.reset(seed=0)
+    for _ in range(5):
+        env.step(env.action_space.sample())
+
+def test_appends_to_existing_data():
+    db = setup_db()
+    db.execute("INSERT INTO profile (id) VALUES (1)")
+    db.execute("INSERT INTO entities (id, profile_id, entity_type, name) VALUES (1, 1, 'person', 'Alice')")
+    db.commit()
+
+    SyntheticProfileGenerator(db, seed=1).generate(50)
+    assert db.execute("SELECT MIN(id), COUNT(*) FROM profile").fetchone() == (1, 51)
+    assert db.execute("SELECT name FROM entities WHERE id = 1").fetchone() == ('Alice',)
+
+if __name__ == "__main__":
+    test_generates_seeded_realistic_profiles()
+    test_appends_to_existing_data()
@@ -0,0 +1,188 @@
+import gc
+import sqlite3
+import json
+import os
+import sys
+import pytest
+
+# Add the shared directory to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+
+from shared.rl.digital_twin_rl import DigitalTwinTrainer, PersonalLifeEnv
+from shared.rl.validation_feedback import ValidationFeedbackConsumer
+
+def setup_db():
+    db = sqlite3.connect(':memory:')
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        db.executescript(f.read())
+
+    cursor = db.cursor()
+    cursor.execute("INSERT INTO profile (id) VALUES (101)")
+    cursor.execute("INSERT INTO profile (id) VALUES (102)")
+    cursor.execute("INSERT INTO dimensions (id, name) VALUES (1, 'Values')")
+    db.commit()
+    return db
+
+def add_validation_question(db, profile_id, action_type, question_type='RL_VALIDATION'):
+    cursor = db.cursor()
+    cursor.execute("""
+        INSERT INTO questions (profile_id, text, question_type, primary_dimension_id, metadata)
+        VALUES (?, ?, ?, 1, ?)
+    """, (profile_id, f"Q{profile_id}-{action_type}-{question_type}", question_type,
+          json.dumps({'scenario': 'workday', 'agent_action': action_type, 'action_params': [0, 0, 0, 0]})))
+    question_id = cursor.lastrowid
+    options = {}
+    for text, weight in [("Yes, exactly", 1.0), ("Sort of", 0.5), ("No, not at all", 0.0)]:
+        cursor.execute("INSERT INTO answer_options (question_id, text, weight) VALUES (?, ?, ?)", (question_id, text, weight))
+        options[text] = cursor.lastrowid
+    db.commit()
+    return question_id, options
+
+def answer(db, profile_id, question_id, option_id, response_type='selected'):
+    db.execute("INSERT INTO responses (profile_id, question_id, answer_option_id, response_type) VALUES (?, ?, ?, ?)",
+               (profile_id, question_id, option_id, response_type))
+    db.commit()
+
+def test_feedback_updates_live_envs_incrementally():
+    db = setup_db()
+    trainer = DigitalTwinTrainer(db, 101)
+    other = DigitalTwinTrainer(db, 102)
+    env = trainer.env
+    base_rest = env.alignment_rewards['rest']
+    base_learn = env.alignment_rewards['learn']
+    other_rest = other.env.alignment_rewards['rest']
+
+    rest_q, rest_opts = add_validation_question(db, 101, 'rest')
+    learn_q, learn_opts = add_validation_question(db, 101, 'learn')
+    survey_q, survey_opts = add_validation_question(db, 101, 'rest', question_type='choice')
+
+    answer(db, 101, rest_q, rest_opts["Yes, exactly"])
+    answer(db, 101, learn_q, learn_opts["No, not at all"])
+    answer(db, 101, survey_q, survey_opts["No, not at all"])  # not an RL_VALIDATION question
+
+    consumer = ValidationFeedbackConsumer(db, learning_rate=0.5, max_adjustment=0.4)
+    assert consumer.consume() == 2
+
+    # The live env picked up the change without being rebuilt
+    assert env.alignment_rewards['rest'] == pytest.approx(base_rest + 0.2)
+    assert env.alignment_rewards['learn'] == pytest.approx(base_learn - 0.2)
+    assert other.env.alignment_rewards['rest'] == other_rest
+
+    # Nothing new past the watermark: no work, no change
+    assert consumer.consume() == 0
+    assert env.alignment_rewards['rest'] == pytest.approx(base_rest + 0.2)
+
+    # "Sort of" pulls the adjustment back towards neutral
+    answer(db, 101, rest_q, rest_opts["Sort of"])
+    assert consumer.consume() == 1
+    assert env.alignment_rewards['rest'] == pytest.approx(base_rest + 0.1)
+
+    cursor = db.cursor()
+    cursor.execute("SELECT adjustment, feedback_count FROM rl_alignment_adjustments WHERE profile_id = 101 AND action_type = 'rest'")
+    adjustment, count = cursor.fetchone()
+    assert adjustment == pytest.approx(0.1) and count == 2
+
+    # New envs load the persisted adjustments; DB-less envs are unaffected
+    fresh = PersonalLifeEnv(trainer.user_data, {}, db_connection=db)
+    assert fresh.alignment_rewards['rest'] == pytest.approx(env.alignment_rewards['rest'])
+    assert PersonalLifeEnv(trainer.user_data, {}).alignment_rewards['rest'] == PersonalLifeEnv.VALUE_SCORES['rest']
+
+def test_adjustments_are_bounded_and_profile_scoped():
+    db = setup_db()
+    q, opts = add_validation_question(db, 101, 'exercise')
+    for _ in range(50):
+        answer(db, 101, q, opts["Yes, exactly"])
+    # SENTINEL: Another profile answering this profile's question is ignored
+    answer(db, 102, q, opts["No, not at all"])
+    # Skipped answers only advance the watermark
+    answer(db, 101, q, None, response_type='skipped')
+
+    consumer = ValidationFeedbackConsumer(db, learning_rate=0.3, max_adjustment=0.5)
+    assert consumer.consume(batch_size=7) == 51
+
+    cursor = db.cursor()
+    cursor.execute("SELECT profile_id, adjustment, feedback_count FROM rl_alignment_adjustments")
+    rows = cursor.fetchall()
+    assert len(rows) == 1
+    profile_id, adjustment, count = rows[0]
+    assert profile_id == 101 and count == 50
+    assert 0.49 < adjustment <= 0.5
+    assert consumer.watermark() == 52
+
+def test_adjustments_are_scoped_to_their_database():
+    db, other_db = setup_db(), setup_db()
+    q, opts = add_validation_question(db, 101, 'rest')
+    answer(db, 101, q, opts["Yes, exactly"])
+    ValidationFeedbackConsumer(db, learning_rate=1.0, max_adjustment=0.4).consume()
+
+    env = DigitalTwinTrainer(db, 101).env
+    rest = env.alignment_rewards['rest']
+    assert env.alignment_adjustments == {'rest': pytest.approx(0.4)}
+
+    # Same profile on a DB without feedback (or without the table at all) leaves env untouched
+    ValidationFeedbackConsumer(other_db)
+    DigitalTwinTrainer(other_db, 101)
+    DigitalTwinTrainer(setup_db(), 101)
+    assert env.alignment_adjustments == {'rest': pytest.approx(0.4)}
+    assert env.alignment_rewards['rest'] == rest
+
+def test_watermark_moves_past_non_validation_responses():
+    db = setup_db()
+    q, opts = add_validation_question(db, 101, 'rest')
+    survey_q, survey_opts = add_validation_question(db, 101, 'rest', question_type='choice')
+    answer(db, 101, q, opts["Yes, exactly"])
+    db.executemany("INSERT INTO responses (profile_id, question_id, answer_option_id, response_type) VALUES (101, ?, ?, 'selected')",
+                   [(survey_q, survey_opts["Sort of"])] * 5000)
+    db.commit()
+
+    consumer = ValidationFeedbackConsumer(db)
+    assert consumer.consume() == 1
+    # Survey responses are scanned once, never again on later polls
+    assert consumer.watermark() == 5001
+    assert consumer.consume() == 0
+
+def test_fresh_databases_never_inherit_adjustments(tmp_path):
+    # In-memory DB: feedback, then the connection goes away; a new DB may reuse its id()
+    db = setup_db()
+    q, opts = add_validation_question(db, 101, 'rest')
+    answer(db, 101, q, opts["Yes, exactly"])
+    ValidationFeedbackConsumer(db, learning_rate=1.0, max_adjustment=0.4).consume()
+    trainer = DigitalTwinTrainer(db, 101)
+    assert trainer.env.alignment_adjustments == {'rest': pytest.approx(0.4)}
+    del trainer
+    db.close()
+    del db
+    gc.collect()
+
+    for _ in range(5):
+        env = DigitalTwinTrainer(setup_db(), 101).env
+        assert env.alignment_adjustments == {}
+        assert env.alignment_rewards['rest'] == PersonalLifeEnv.VALUE_SCORES['rest']
+
+    # File DB: rows deleted behind the cache are dropped for live envs too on the next load
+    file_db = sqlite3.connect(str(tmp_path / 'twin.db'))
+    schema_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../mobile/src/database/schema.sql'))
+    with open(schema_path, 'r') as f:
+        file_db.executescript(f.read())
+    file_db.execute("INSERT INTO profile (id) VALUES (101)")
+    file_db.execute("INSERT INTO dimensions (id, name) VALUES (1, 'Values')")
+    q, opts = add_validation_question(file_db, 101, 'rest')
+    answer(file_db, 101, q, opts["No, not at all"])
+    ValidationFeedbackConsumer(file_db, learning_rate=1.0, max_adjustment=0.4).consume()
+    live = DigitalTwinTrainer(file_db, 101).env
+    assert live.alignment_adjustments == {'rest': pytest.approx(-0.4)}
+
+    file_db.execute("DELETE FROM rl_alignment_adjustments")
+    file_db.commit()
+    DigitalTwinTrainer(file_db, 101)
+    assert live.alignment_adjustments == {}
+    assert live.alignment_rewards['rest'] == PersonalLifeEnv.VALUE_SCORES['rest']
+
+if __name__ == "__main__":
+    test_feedback_updates_live_envs_incrementally()
+    test_adjustments_are_bounded_and_profile_scoped()
+    test_adjustments_are_scoped_to_their_database()
+    test_watermark_moves_past_non_validation_responses()
+    import tempfile, pathlib
+    test_fresh_databases_never_inherit_adjustments(pathlib.Path(tempfile.mkdtemp()))
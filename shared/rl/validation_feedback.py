@@ -0,0 +1,138 @@
+import json
+from typing import Dict, Tuple
+
+from shared.rl.digital_twin_rl import ALIGNMENT_ADJUSTMENTS, AlignmentAdjustmentCache
+
+# ============================================
+# INCREMENTAL VALIDATION FEEDBACK
+# ============================================
+
+FEEDBACK_SCHEMA = """
+-- Per-profile alignment reward offsets learned from RL_VALIDATION answers
+CREATE TABLE IF NOT EXISTS rl_alignment_adjustments (
+    profile_id INTEGER NOT NULL REFERENCES profile(id),
+    action_type VARCHAR(50) NOT NULL,
+    adjustment REAL DEFAULT 0.0,
+    feedback_count INTEGER DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (profile_id, action_type)
+);
+
+CREATE TABLE IF NOT EXISTS rl_feedback_watermarks (
+    consumer VARCHAR(50) PRIMARY KEY,
+    last_response_id INTEGER DEFAULT 0
+);
+"""
+
+
+def ensure_feedback_schema(db):
+    db.executescript(FEEDBACK_SCHEMA)
+    db.commit()
+
+
+class ValidationFeedbackConsumer:
+    """
+    Folds answers to RL_VALIDATION questions into per-profile alignment reward
+    adjustments, reading only responses past a stored watermark.
+
+    Each answer's option weight (1.0 "Yes, exactly", 0.5 "Sort of", 0.0 "No")
+    becomes a signal in [-1, 1] that moves the adjustment for the suggested
+    action towards signal * max_adjustment by learning_rate. Updates are written
+    with the watermark in one transaction and pushed to live envs in place.
+    """
+
+    def __init__(self, db_connection, learning_rate: float = 0.2, max_adjustment: float = 0.5,
+                 consumer: str = 'rl_validation', cache: AlignmentAdjustmentCache = ALIGNMENT_ADJUSTMENTS):
+        self.db = db_connection
+        self.learning_rate = learning_rate
+        self.max_adjustment = max_adjustment
+        self.consumer = consumer
+        self.cache = cache
+        ensure_feedback_schema(db_connection)
+
+    def watermark(self) -> int:
+        cursor = self.db.cursor()
+        cursor.execute("SELECT last_response_id FROM rl_feedback_watermarks WHERE consumer = ?", (self.consumer,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def consume(self, batch_size: int = 1000) -> int:
+        """Processes all new validation responses. Returns the number of responses read."""
+        applied = 0
+        while True:
+            n = self._consume_batch(batch_size)
+            applied += n
+            if n < batch_size:
+                return applied
+
+    def _consume_batch(self, batch_size: int) -> int:
+        cursor = self.db.cursor()
+        watermark = self.watermark()
+        # Snapshot the newest response first: everything up to it is scanned by this batch
+        # unless the batch fills up, so the watermark also moves past non-validation responses
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM responses")
+        newest = cursor.fetchone()[0]
+        if newest <= watermark:
+            return 0
+
+        # BOLT: Range scan on the responses primary key; only rows past the watermark are read
+        # SENTINEL: Only a profile's own answers to its own questions count
+        cursor.execute("""
+            SELECT r.id, r.profile_id, q.metadata, ao.weight
+            FROM responses r
+            JOIN questions q ON q.id = r.question_id
+            LEFT JOIN answer_options ao ON ao.id = r.answer_option_id AND ao.question_id = q.id
+            WHERE r.id > ? AND r.id <= ? AND q.question_type = 'RL_VALIDATION' AND q.profile_id = r.profile_id
+            ORDER BY r.id
+            LIMIT ?
+        """, (watermark, newest, batch_size))
+        rows = cursor.fetchall()
+        new_watermark = rows[-1][0] if len(rows) == batch_size else newest
+
+        feedback = []
+        for response_id, profile_id, metadata, weight in rows:
+            action_type = json.loads(metadata).get('agent_action') if metadata else None
+            # Skipped / "don't care" answers carry no option weight and advance the watermark only
+            if action_type and weight is not None:
+                feedback.append((profile_id, action_type, 2.0 * float(weight) - 1.0))
+
+        current = self._load_current({(p, a) for p, a, _ in feedback})
+        updated: Dict[Tuple, list] = {}
+        for profile_id, action_type, signal in feedback:
+            key = (profile_id, action_type)
+            adjustment, count = updated.get(key) or current.get(key, (0.0, 0))
+            adjustment += self.learning_rate * (signal * self.max_adjustment - adjustment)
+            updated[key] = [adjustment, count + 1]
+
+        with self.db:
+            self.db.executemany("""
+                INSERT INTO rl_alignment_adjustments (profile_id, action_type, adjustment, feedback_count, updated_at)
+                VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(profile_id, action_type) DO UPDATE SET
+                    adjustment = excluded.adjustment,
+                    feedback_count = excluded.feedback_count,
+                    updated_at = excluded.updated_at
+            """, [(p, a, adj, count) for (p, a), (adj, count) in updated.items()])
+            self.db.execute("""
+                INSERT INTO rl_feedback_watermarks (consumer, last_response_id) VALUES (?, ?)
+                ON CONFLICT(consumer) DO UPDATE SET last_response_id = excluded.last_response_id
+            """, (self.consumer, new_watermark))
+
+        by_profile: Dict = {}
+        for (profile_id, action_type), (adjustment, _) in updated.items():
+            by_profile.setdefault(profile_id, {})[action_type] = adjustment
+        for profile_id, adjustments in by_profile.items():
+            self.cache.update(self.db, profile_id, adjustments)
+        return len(rows)
+
+    def _load_current(self, keys) -> Dict[Tuple, Tuple[float, int]]:
+        if not keys:
+            return {}
+        profile_ids = sorted({p for p, _ in keys})
+        cursor = self.db.cursor()
+        cursor.execute(f"""
+            SELECT profile_id, action_type, adjustment, feedback_count
+            FROM rl_alignment_adjustments
+            WHERE profile_id IN ({','.join('?' * len(profile_ids))})
+        """, profile_ids)
+        return {(p, a): (adj, count) for p, a, adj, count in cursor.fetchall() if (p, a) in keys}
@@ -0,0 +1,21 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# ============================================
+# TRAINING / EVALUATION WORKER POOLS
+# ============================================
+
+
+def _init_worker():
+    import torch
+
+    # BOLT: One torch thread per worker; the pool provides the parallelism
+    torch.set_num_threads(1)
+
+
+def spawn_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool for torch training and evaluation jobs (sweeps, batch evaluation, retraining)."""
+    # BOLT: Spawned workers avoid inheriting torch/OpenMP thread state via fork
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_worker)
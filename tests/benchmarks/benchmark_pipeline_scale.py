@@ -0,0 +1,35 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from shared.rl.digital_twin_rl import PersonalLifeEnv, DataPipeline
+from shared.rl.synthetic_profiles import create_synthetic_db
+
+def benchmark_pipeline_scale(n_profiles=100000, n_samples=1000):
+    path = os.path.join(tempfile.mkdtemp(), 'synthetic.db')
+
+    start = time.time()
+    counts = create_synthetic_db(path, n_profiles)
+    print(f"Generated {sum(counts.values())} rows for {n_profiles} profiles in {time.time() - start:.2f}s")
+
+    db = sqlite3.connect(path)
+    pipeline = DataPipeline(db)
+    sample = random.Random(0).sample(range(1, n_profiles + 1), min(n_samples, n_profiles))
+
+    start = time.time()
+    user_datas = [pipeline.prepare_user_data(profile_id) for profile_id in sample]
+    elapsed = time.time() - start
+    print(f"DataPipeline.prepare_user_data: {elapsed / len(sample) * 1e3:.3f}ms per profile")
+
+    start = time.time()
+    for user_data in user_datas:
+        PersonalLifeEnv(user_data, user_data['preferences'], db_connection=db)
+    elapsed = time.time() - start
+    print(f"PersonalLifeEnv init (with pattern cache): {elapsed / len(sample) * 1e3:.3f}ms per profile")
+
+if __name__ == "__main__":
+    benchmark_pipeline_scale(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,37 @@
+import copy
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
+from shared.rl.digital_twin_rl import PersonalLifeEnv
+
+def benchmark_snapshot(n_entities=20, n_iters=10000):
+    user_data = {
+        'profile_id': 1,
+        'projects': [{'id': i, 'name': f'P{i}', 'progress': 0.1, 'priority': 0.8, 'deadline_days': 5} for i in range(n_entities)],
+        'relationships': [{'id': i, 'name': f'R{i}', 'strength': 0.5, 'priority': 0.5, 'days_since_contact': 7} for i in range(n_entities)]
+    }
+    env = PersonalLifeEnv(user_data, {}, db_connection=None)
+    env.reset(seed=0)
+
+    start = time.time()
+    for _ in range(n_iters // 10):
+        copy.deepcopy(env)
+    deepcopy_us = (time.time() - start) / (n_iters // 10) * 1e6
+
+    start = time.time()
+    for _ in range(n_iters):
+        snap = env.snapshot()
+    snapshot_us = (time.time() - start) / n_iters * 1e6
+
+    start = time.time()
+    for _ in range(n_iters):
+        env.restore(snap)
+    restore_us = (time.time() - start) / n_iters * 1e6
+
+    print(f"Entities: {n_entities:3} | deepcopy: {deepcopy_us:8.2f}µs | snapshot: {snapshot_us:6.2f}µs | restore: {restore_us:6.2f}µs")
+
+if __name__ == "__main__":
+    for n in [5, 20, 100]:
+        benchmark_snapshot(n)